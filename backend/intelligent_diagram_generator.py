@@ -12,6 +12,31 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Service -> (diagrams module, node class) used in generated diagram code
+SERVICE_IMPORTS = {
+    "virtual_machines": ("diagrams.azure.compute", "VM"),
+    "app_services": ("diagrams.azure.compute", "AppServices"),
+    "aks": ("diagrams.azure.compute", "AKS"),
+    "virtual_network": ("diagrams.azure.network", "VirtualNetworks"),
+    "application_gateway": ("diagrams.azure.network", "ApplicationGateway"),
+    "firewall": ("diagrams.azure.network", "Firewall"),
+    "storage_accounts": ("diagrams.azure.storage", "StorageAccounts"),
+    "sql_database": ("diagrams.azure.database", "SQLDatabases"),
+    "cosmos_db": ("diagrams.azure.database", "CosmosDb"),
+    "key_vault": ("diagrams.azure.security", "KeyVaults"),
+    "active_directory": ("diagrams.azure.identity", "ActiveDirectory")
+}
+# Import statement per service, formatted once at import time
+SERVICE_IMPORT_LINES = {
+    service: f"from {module} import {class_name}"
+    for service, (module, class_name) in SERVICE_IMPORTS.items()
+}
+
+# Service tiers that decide which clusters and connections the generated diagram code contains
+APP_TIER_SERVICES = frozenset({"app_services", "virtual_machines", "aks"})
+DATA_TIER_SERVICES = frozenset({"sql_database", "cosmos_db", "storage_accounts"})
+IDENTITY_TIER_SERVICES = frozenset({"key_vault", "active_directory"})
+
 @dataclass
 class ArchitectureRequirement:
     """Represents an architecture requirement parsed from natural language"""
@@ -168,74 +193,75 @@ class OpenAILLMOrchestrator:
         if "objective" in text_lower or "goal" in text_lower:
             # Extract sentence containing objective/goal
             sentences = requirements_text.split('.')
-            for sentence in sentences:
-                if any(word in sentence.lower() for word in ['objective', 'goal', 'purpose', 'need']):
-                    business_obj = sentence.strip()
-                    break
+            business_obj = next(
+                (sentence.strip() for sentence in sentences
+                 if any(word in sentence.lower() for word in ('objective', 'goal', 'purpose', 'need'))),
+                business_obj
+            )
         
         # Parse technical requirements
         tech_req = []
-        if any(word in text_lower for word in ['high availability', 'ha', 'availability']):
+        if any(word in text_lower for word in ('high availability', 'ha', 'availability')):
             tech_req.append("High availability")
-        if any(word in text_lower for word in ['scale', 'scalability', 'elastic']):
+        if any(word in text_lower for word in ('scale', 'scalability', 'elastic')):
             tech_req.append("Auto-scaling capabilities")
-        if any(word in text_lower for word in ['performance', 'fast', 'speed']):
+        if any(word in text_lower for word in ('performance', 'fast', 'speed')):
             tech_req.append("High performance")
-        if any(word in text_lower for word in ['microservice', 'container', 'kubernetes']):
+        if any(word in text_lower for word in ('microservice', 'container', 'kubernetes')):
             tech_req.append("Microservices architecture")
         
         # Parse security requirements
         security_req = []
-        if any(word in text_lower for word in ['security', 'secure', 'protection']):
+        if any(word in text_lower for word in ('security', 'secure', 'protection')):
             security_req.append("Network security")
-        if any(word in text_lower for word in ['encryption', 'encrypt']):
+        if any(word in text_lower for word in ('encryption', 'encrypt')):
             security_req.append("Data encryption")
-        if any(word in text_lower for word in ['identity', 'authentication', 'auth']):
+        if any(word in text_lower for word in ('identity', 'authentication', 'auth')):
             security_req.append("Identity management")
-        if any(word in text_lower for word in ['firewall', 'waf']):
+        if any(word in text_lower for word in ('firewall', 'waf')):
             security_req.append("Web application firewall")
         
         # Parse compliance
         compliance_req = []
-        if any(word in text_lower for word in ['gdpr', 'privacy']):
+        if any(word in text_lower for word in ('gdpr', 'privacy')):
             compliance_req.append("GDPR compliance")
-        if any(word in text_lower for word in ['hipaa', 'healthcare']):
+        if any(word in text_lower for word in ('hipaa', 'healthcare')):
             compliance_req.append("HIPAA compliance")
-        if any(word in text_lower for word in ['soc', 'audit']):
+        if any(word in text_lower for word in ('soc', 'audit')):
             compliance_req.append("SOC 2 compliance")
         
         # Parse scalability
         scalability_req = []
-        if any(word in text_lower for word in ['load balancing', 'load balancer']):
+        if any(word in text_lower for word in ('load balancing', 'load balancer')):
             scalability_req.append("Load balancing")
-        if any(word in text_lower for word in ['auto scale', 'autoscale']):
+        if any(word in text_lower for word in ('auto scale', 'autoscale')):
             scalability_req.append("Auto-scaling")
-        if any(word in text_lower for word in ['cdn', 'content delivery']):
+        if any(word in text_lower for word in ('cdn', 'content delivery')):
             scalability_req.append("Content delivery network")
         
         # Intelligently detect Azure services
         services = []
-        if any(word in text_lower for word in ['web app', 'web application', 'website']):
+        if any(word in text_lower for word in ('web app', 'web application', 'website')):
             services.append("app_services")
-        if any(word in text_lower for word in ['virtual machine', 'vm', 'compute']):
+        if any(word in text_lower for word in ('virtual machine', 'vm', 'compute')):
             services.append("virtual_machines")
-        if any(word in text_lower for word in ['kubernetes', 'aks', 'container']):
+        if any(word in text_lower for word in ('kubernetes', 'aks', 'container')):
             services.append("aks")
-        if any(word in text_lower for word in ['database', 'sql', 'data']):
+        if any(word in text_lower for word in ('database', 'sql', 'data')):
             services.append("sql_database")
-        if any(word in text_lower for word in ['storage', 'blob', 'file']):
+        if any(word in text_lower for word in ('storage', 'blob', 'file')):
             services.append("storage_accounts")
-        if any(word in text_lower for word in ['cosmos', 'nosql']):
+        if any(word in text_lower for word in ('cosmos', 'nosql')):
             services.append("cosmos_db")
-        if any(word in text_lower for word in ['key vault', 'secrets']):
+        if any(word in text_lower for word in ('key vault', 'secrets')):
             services.append("key_vault")
-        if any(word in text_lower for word in ['active directory', 'ad', 'identity']):
+        if any(word in text_lower for word in ('active directory', 'ad', 'identity')):
             services.append("active_directory")
-        if any(word in text_lower for word in ['firewall', 'security']):
+        if any(word in text_lower for word in ('firewall', 'security')):
             services.append("firewall")
-        if any(word in text_lower for word in ['application gateway', 'load balancer']):
+        if any(word in text_lower for word in ('application gateway', 'load balancer')):
             services.append("application_gateway")
-        if any(word in text_lower for word in ['virtual network', 'vnet', 'network']):
+        if any(word in text_lower for word in ('virtual network', 'vnet', 'network')):
             services.append("virtual_network")
         
         # Only use explicitly detected services - DO NOT add defaults
@@ -243,11 +269,11 @@ class OpenAILLMOrchestrator:
         
         # Determine network topology
         topology = "hub-spoke"
-        if any(word in text_lower for word in ['hub spoke', 'hub-spoke']):
+        if any(word in text_lower for word in ('hub spoke', 'hub-spoke')):
             topology = "hub-spoke"
-        elif any(word in text_lower for word in ['single vnet', 'simple']):
+        elif any(word in text_lower for word in ('single vnet', 'simple')):
             topology = "single-vnet"
-        elif any(word in text_lower for word in ['mesh', 'multi-region']):
+        elif any(word in text_lower for word in ('mesh', 'multi-region')):
             topology = "mesh"
         
         # Create data flow patterns
@@ -282,26 +308,11 @@ class OpenAILLMOrchestrator:
         security_imports = []
         
         # Map services to imports
-        service_import_map = {
-            "virtual_machines": ("diagrams.azure.compute", "VM"),
-            "app_services": ("diagrams.azure.compute", "AppServices"),
-            "aks": ("diagrams.azure.compute", "AKS"),
-            "virtual_network": ("diagrams.azure.network", "VirtualNetworks"),
-            "application_gateway": ("diagrams.azure.network", "ApplicationGateway"),
-            "firewall": ("diagrams.azure.network", "Firewall"),
-            "storage_accounts": ("diagrams.azure.storage", "StorageAccounts"),
-            "sql_database": ("diagrams.azure.database", "SQLDatabases"),
-            "cosmos_db": ("diagrams.azure.database", "CosmosDb"),
-            "key_vault": ("diagrams.azure.security", "KeyVaults"),
-            "active_directory": ("diagrams.azure.identity", "ActiveDirectory")
+        used_imports = {
+            SERVICE_IMPORT_LINES[service]
+            for service in requirements.azure_services if service in SERVICE_IMPORT_LINES
         }
         
-        used_imports = set()
-        for service in requirements.azure_services:
-            if service in service_import_map:
-                module, class_name = service_import_map[service]
-                used_imports.add(f"from {module} import {class_name}")
-        
         imports.extend(sorted(used_imports))
         
         # Generate diagram code
@@ -327,6 +338,9 @@ class OpenAILLMOrchestrator:
     }}
 ):''')
         
+        # The application tier gates its cluster and three connections, so test it once
+        has_app_tier = not APP_TIER_SERVICES.isdisjoint(requirements.azure_services)
+        
         # Generate clusters and components
         if "application_gateway" in requirements.azure_services or "firewall" in requirements.azure_services:
             code_parts.append('    # Internet-facing layer')
@@ -338,7 +352,7 @@ class OpenAILLMOrchestrator:
             code_parts.append('')
         
         # Application layer
-        if any(svc in requirements.azure_services for svc in ["app_services", "virtual_machines", "aks"]):
+        if has_app_tier:
             code_parts.append('    # Application layer')
             code_parts.append('    with Cluster("Application Tier", graph_attr={"style": "rounded,filled", "color": "lightgreen"}):')
             if "app_services" in requirements.azure_services:
@@ -350,7 +364,7 @@ class OpenAILLMOrchestrator:
             code_parts.append('')
         
         # Data layer
-        if any(svc in requirements.azure_services for svc in ["sql_database", "cosmos_db", "storage_accounts"]):
+        if not DATA_TIER_SERVICES.isdisjoint(requirements.azure_services):
             code_parts.append('    # Data layer')
             code_parts.append('    with Cluster("Data Tier", graph_attr={"style": "rounded,filled", "color": "lightyellow"}):')
             if "sql_database" in requirements.azure_services:
@@ -362,7 +376,7 @@ class OpenAILLMOrchestrator:
             code_parts.append('')
         
         # Security layer
-        if any(svc in requirements.azure_services for svc in ["key_vault", "active_directory"]):
+        if not IDENTITY_TIER_SERVICES.isdisjoint(requirements.azure_services):
             code_parts.append('    # Security & Identity')
             code_parts.append('    with Cluster("Security & Identity", graph_attr={"style": "rounded,filled", "color": "lightcoral"}):')
             if "key_vault" in requirements.azure_services:
@@ -379,19 +393,19 @@ class OpenAILLMOrchestrator:
             code_parts.append('    "Internet Users" >> Edge(label="HTTPS", style="bold", color="blue") >> app_gw')
         
         # Gateway to applications
-        if "application_gateway" in requirements.azure_services and any(svc in requirements.azure_services for svc in ["app_services", "aks", "virtual_machines"]):
+        if "application_gateway" in requirements.azure_services and has_app_tier:
             code_parts.append('    app_gw >> Edge(label="HTTP/HTTPS", style="bold") >> apps')
         
         # Applications to database
-        if any(svc in requirements.azure_services for svc in ["app_services", "aks", "virtual_machines"]) and "sql_database" in requirements.azure_services:
+        if has_app_tier and "sql_database" in requirements.azure_services:
             code_parts.append('    apps >> Edge(label="SQL", style="dashed") >> db')
         
         # Applications to storage
-        if any(svc in requirements.azure_services for svc in ["app_services", "aks", "virtual_machines"]) and "storage_accounts" in requirements.azure_services:
+        if has_app_tier and "storage_accounts" in requirements.azure_services:
             code_parts.append('    apps >> Edge(label="Storage API", style="dashed") >> storage')
         
         # Security connections
-        if "key_vault" in requirements.azure_services and any(svc in requirements.azure_services for svc in ["app_services", "aks", "virtual_machines"]):
+        if "key_vault" in requirements.azure_services and has_app_tier:
             code_parts.append('    apps >> Edge(label="Secrets", style="dotted", color="red") >> kv')
         
         return '\n'.join(code_parts)
@@ -462,12 +476,12 @@ class EnterpriseReviewAgent:
             score -= 5
         
         # Network security
-        if "Firewall" not in diagram_code and not any(sec in requirements.security_requirements for sec in ["Network security", "firewall"]):
+        if "Firewall" not in diagram_code and not any(sec in requirements.security_requirements for sec in ("Network security", "firewall")):
             recommendations.append("Consider adding Azure Firewall for network security")
             score -= 5
         
         # High availability
-        if not any(ha in str(requirements.technical_requirements) for ha in ["High availability", "availability"]):
+        if not any(ha in str(requirements.technical_requirements) for ha in ("High availability", "availability")):
             recommendations.append("Consider high availability design patterns")
             score -= 5
         
@@ -477,7 +491,7 @@ class EnterpriseReviewAgent:
             score -= 5
         
         # Data protection
-        if any(db in requirements.azure_services for db in ["sql_database", "cosmos_db"]) and "backup" not in str(requirements.technical_requirements):
+        if any(db in requirements.azure_services for db in ("sql_database", "cosmos_db")) and "backup" not in str(requirements.technical_requirements):
             recommendations.append("Consider backup and disaster recovery for data services")
             score -= 5
         
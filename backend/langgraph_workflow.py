@@ -9,6 +9,8 @@ that clearly differentiate hub and spoke architecture principles. The workflow:
 """
 
 import logging
+from functools import lru_cache
+from itertools import chain
 from typing import Dict, List, Any, Optional, TypedDict
 from dataclasses import dataclass, asdict
 import json
@@ -105,6 +107,52 @@ SPOKE_SERVICES = {
     'machine_learning', 'search_service'
 }
 
+# Spoke service -> workload tier used when categorizing spoke services
+SPOKE_SERVICE_TIERS = {
+    # Web tier
+    'app_services': 'web_tier', 'web_apps': 'web_tier',
+    # Application tier
+    'virtual_machines': 'application_tier', 'function_apps': 'application_tier', 'aks': 'application_tier',
+    # Data tier
+    'sql_database': 'data_tier', 'cosmos_db': 'data_tier', 'mysql': 'data_tier', 'postgresql': 'data_tier',
+    # Integration tier
+    'api_management': 'integration_tier', 'service_bus': 'integration_tier', 'event_hubs': 'integration_tier'
+}
+
+# Compute services that require a spoke VNet to host them
+SPOKE_VNET_COMPUTE_SERVICES = frozenset({'virtual_machines', 'vm', 'vmss', 'aks', 'k8s', 'kubernetes'})
+
+# Spoke subnet layout in allocation order: (subnet name, services that need it, prefix length, /24 blocks used)
+SPOKE_SUBNET_LAYOUT = (
+    # VM subnet - REQUIRED when VMs are requested
+    ("VirtualMachinesSubnet", frozenset({'virtual_machines', 'vm', 'vmss'}), 24, 1),
+    # Web tier subnet if web services present
+    ("WebTierSubnet", frozenset({'app_services', 'web_apps'}), 24, 1),
+    # App tier subnet if compute services present
+    ("AppTierSubnet", frozenset({'aks', 'function_apps', 'k8s', 'kubernetes'}), 24, 1),
+    # Data tier subnet if database services present
+    ("DataTierSubnet", frozenset({'sql_database', 'cosmos_db', 'mysql'}), 24, 1),
+    # Container subnet if container services present (AKS/K8S needs larger address space)
+    ("ContainerSubnet", frozenset({'aks', 'container_instances', 'k8s', 'kubernetes'}), 23, 2),
+)
+
+def _mentions_any(service: str, keywords) -> bool:
+    """Check whether any keyword occurs in the service name, lower-casing the name only once"""
+    service_lower = service.lower()
+    return any(keyword in service_lower for keyword in keywords)
+
+# The keyword scans depend only on the service name, so each name is resolved once
+# and every later hub/spoke check for it is a single cache lookup
+@lru_cache(maxsize=512)
+def _is_hub_service(service: str) -> bool:
+    """Check whether a service name matches a hub service keyword"""
+    return _mentions_any(service, HUB_SERVICES)
+
+@lru_cache(maxsize=512)
+def _is_spoke_service(service: str) -> bool:
+    """Check whether a service name matches a spoke service keyword"""
+    return _mentions_any(service, SPOKE_SERVICES)
+
 class WorkflowState(TypedDict):
     """State schema for LangGraph workflow"""
     customer_inputs: Dict[str, Any]
@@ -126,7 +174,7 @@ class HubAgentResult:
     security_policies: Dict[str, Any]
     connectivity_matrix: Dict[str, Any]
     
-@dataclass 
+@dataclass
 class SpokeAgentResult:
     """Result from spoke agent processing"""
     spoke_services: List[str]
@@ -144,16 +192,14 @@ class HubAgent:
     def analyze_hub_services(self, inputs: Dict[str, Any]) -> HubAgentResult:
         """Analyze and determine hub services based on customer inputs"""
         
-        # Extract services that belong to hub
-        all_services = []
-        
-        # Collect all selected services
-        for service_category in ['network_services', 'security_services', 'monitoring_services']:
-            if service_category in inputs and inputs[service_category]:
-                all_services.extend(inputs[service_category])
+        # Collect all selected services that may belong to the hub
+        all_services = chain.from_iterable(
+            inputs.get(service_category) or []
+            for service_category in ('network_services', 'security_services', 'monitoring_services')
+        )
         
         # Filter hub services
-        hub_services = [svc for svc in all_services if any(hub_svc in svc.lower() for hub_svc in HUB_SERVICES)]
+        hub_services = [svc for svc in all_services if _is_hub_service(svc)]
         
         # Always include core hub services for proper architecture
         core_hub_services = ['azure_firewall', 'bastion', 'dns']
@@ -280,16 +326,14 @@ class SpokeAgent:
     def analyze_spoke_services(self, inputs: Dict[str, Any], hub_context: Dict[str, Any]) -> SpokeAgentResult:
         """Analyze and determine spoke services based on customer inputs and hub context"""
         
-        # Extract services that belong to spokes
-        all_services = []
-        
-        # Collect all selected services
-        for service_category in ['compute_services', 'database_services', 'storage_services', 'ai_services', 'analytics_services']:
-            if service_category in inputs and inputs[service_category]:
-                all_services.extend(inputs[service_category])
+        # Collect all selected services that may belong to spokes
+        all_services = chain.from_iterable(
+            inputs.get(service_category) or []
+            for service_category in ('compute_services', 'database_services', 'storage_services', 'ai_services', 'analytics_services')
+        )
         
         # Filter spoke services
-        spoke_services = [svc for svc in all_services if any(spoke_svc in svc.lower() for spoke_svc in SPOKE_SERVICES)]
+        spoke_services = [svc for svc in all_services if _is_spoke_service(svc)]
         
         # CRITICAL: Ensure VMs are always placed in spoke VNets when requested
         spoke_services = self._enforce_vm_spoke_placement(spoke_services, inputs)
@@ -318,18 +362,16 @@ class SpokeAgent:
         """Ensure VMs are always properly categorized as spoke services and require spoke VNet creation"""
         vm_services = ['vm', 'virtual_machines', 'virtual_machine']
         
-        # Check if any VM services are mentioned in any category
-        vm_requested = False
-        for service_category in inputs:
-            if isinstance(inputs[service_category], list):
-                for service in inputs[service_category]:
-                    if any(vm_svc in service.lower() for vm_svc in vm_services):
-                        vm_requested = True
-                        break
+        # Check if any VM services are mentioned in any category, stopping at the first match
+        vm_requested = any(
+            _mentions_any(service, vm_services)
+            for category_services in inputs.values() if isinstance(category_services, list)
+            for service in category_services
+        )
         
         # If VMs are requested but not in spoke_services, add them
         if vm_requested:
-            if not any(any(vm_svc in svc.lower() for vm_svc in vm_services) for svc in spoke_services):
+            if not any(_mentions_any(svc, vm_services) for svc in spoke_services):
                 spoke_services.append('virtual_machines')
             
             # Log the enforcement action
@@ -344,7 +386,12 @@ class SpokeAgent:
         architecture_style = inputs.get('architecture_style', 'n_tier')
         
         # Ensure spoke VNet is created when VMs or other compute services are requested
-        vm_services_present = any(svc in spoke_services for svc in ['virtual_machines', 'vm', 'vmss', 'aks', 'k8s', 'kubernetes'])
+        vm_services_present = not SPOKE_VNET_COMPUTE_SERVICES.isdisjoint(spoke_services)
+        
+        # Tiering does not depend on the environment, so categorize once; the development
+        # spoke gets its own lists so neither spoke can alias the other's tiers
+        production_services = self._categorize_spoke_services(spoke_services, "production")
+        development_services = {tier: list(services) for tier, services in production_services.items()}
         
         components = {
             "production_spoke": {
@@ -355,7 +402,7 @@ class SpokeAgent:
                     # Ensure VNet is created when compute services are present
                     "required": vm_services_present or len(spoke_services) > 0
                 },
-                "services": self._categorize_spoke_services(spoke_services, "production"),
+                "services": production_services,
                 "peering_to_hub": True if hub_context else False
             },
             "development_spoke": {
@@ -366,7 +413,7 @@ class SpokeAgent:
                     # Ensure VNet is created when compute services are present
                     "required": vm_services_present or len(spoke_services) > 0
                 },
-                "services": self._categorize_spoke_services(spoke_services, "development"),
+                "services": development_services,
                 "peering_to_hub": True if hub_context else False
             }
         }
@@ -375,6 +422,10 @@ class SpokeAgent:
     
     def _design_spoke_subnets(self, spoke_services: List[str], environment: str) -> Dict[str, str]:
         """Design subnet layout for spoke based on services"""
+        # Hub-only requests have no workloads to lay out, so skip the subnet table scan
+        if not spoke_services:
+            return {}
+        
         subnets = {}
         
         # Base subnets
@@ -384,31 +435,12 @@ class SpokeAgent:
             base_cidr = "10.2"
         
         subnet_counter = 1
+        present_services = set(spoke_services)
         
-        # VM subnet - REQUIRED when VMs are requested
-        if any(svc in spoke_services for svc in ['virtual_machines', 'vm', 'vmss']):
-            subnets[f"VirtualMachinesSubnet"] = f"{base_cidr}.{subnet_counter}.0/24"
-            subnet_counter += 1
-        
-        # Web tier subnet if web services present
-        if any(svc in spoke_services for svc in ['app_services', 'web_apps']):
-            subnets[f"WebTierSubnet"] = f"{base_cidr}.{subnet_counter}.0/24"
-            subnet_counter += 1
-        
-        # App tier subnet if compute services present  
-        if any(svc in spoke_services for svc in ['aks', 'function_apps', 'k8s', 'kubernetes']):
-            subnets[f"AppTierSubnet"] = f"{base_cidr}.{subnet_counter}.0/24"
-            subnet_counter += 1
-        
-        # Data tier subnet if database services present
-        if any(svc in spoke_services for svc in ['sql_database', 'cosmos_db', 'mysql']):
-            subnets[f"DataTierSubnet"] = f"{base_cidr}.{subnet_counter}.0/24"
-            subnet_counter += 1
-        
-        # Container subnet if container services present (AKS/K8S needs larger address space)
-        if any(svc in spoke_services for svc in ['aks', 'container_instances', 'k8s', 'kubernetes']):
-            subnets[f"ContainerSubnet"] = f"{base_cidr}.{subnet_counter}.0/23"
-            subnet_counter += 2
+        for subnet_name, subnet_services, prefix_length, blocks in SPOKE_SUBNET_LAYOUT:
+            if not subnet_services.isdisjoint(present_services):
+                subnets[subnet_name] = f"{base_cidr}.{subnet_counter}.0/{prefix_length}"
+                subnet_counter += blocks
         
         return subnets
     
@@ -422,14 +454,9 @@ class SpokeAgent:
         }
         
         for service in spoke_services:
-            if service in ['app_services', 'web_apps']:
-                categories["web_tier"].append(service)
-            elif service in ['virtual_machines', 'function_apps', 'aks']:
-                categories["application_tier"].append(service)
-            elif service in ['sql_database', 'cosmos_db', 'mysql', 'postgresql']:
-                categories["data_tier"].append(service)
-            elif service in ['api_management', 'service_bus', 'event_hubs']:
-                categories["integration_tier"].append(service)
+            tier = SPOKE_SERVICE_TIERS.get(service)
+            if tier:
+                categories[tier].append(service)
         
         return categories
     
@@ -467,7 +494,7 @@ class SpokeAgent:
         scalability = inputs.get('scalability', 'moderate')
         
         config = {
-            "auto_scaling": scalability in ['high', 'elastic'],
+            "auto_scaling": scalability in ('high', 'elastic'),
             "scaling_metrics": ["cpu_utilization", "memory_utilization", "request_count"],
             "scaling_policies": {
                 "scale_out_threshold": 70,
@@ -612,8 +639,8 @@ class AzureLandingZoneOrchestrator:
 
 def categorize_services_by_hub_spoke(services: List[str]) -> Dict[str, List[str]]:
     """Categorize a list of services into hub and spoke categories"""
-    hub_services = [svc for svc in services if any(hub_svc in svc.lower() for hub_svc in HUB_SERVICES)]
-    spoke_services = [svc for svc in services if any(spoke_svc in svc.lower() for spoke_svc in SPOKE_SERVICES)]
+    hub_services = [svc for svc in services if _is_hub_service(svc)]
+    spoke_services = [svc for svc in services if _is_spoke_service(svc)]
     
     return {
         "hub_services": hub_services,
@@ -15,7 +15,10 @@ import tempfile
 import logging
 import traceback
 from datetime import datetime
+from functools import partial
+from itertools import islice, product
 from pathlib import Path
+from types import MappingProxyType
 import requests
 import google.generativeai as genai
 
@@ -320,6 +323,59 @@ AZURE_SERVICES_MAPPING = {
     "purview": {"name": "Microsoft Purview", "icon": "🔍", "drawio_shape": "purview", "diagram_class": SecurityCenter, "category": "governance"},
 }
 
+# Hub-spoke palette shared by cluster borders and edges, so every edge reuses one string object
+HUB_COLOR = "#0078d4"
+SPOKE_COLOR = "#d83b01"
+DEV_SPOKE_COLOR = "#107c10"
+LINK_COLOR = "#666666"
+
+def _rounded_cluster(bgcolor: str) -> Dict[str, str]:
+    """Graphviz attributes of a rounded, plain-bordered cluster"""
+    return {"bgcolor": bgcolor, "style": "rounded"}
+
+def _dashed_cluster(bgcolor: str, color: str, **extra: str) -> Dict[str, str]:
+    """Graphviz attributes of a dashed cluster with a coloured 2px border (VNets and spoke workloads)"""
+    return {"bgcolor": bgcolor, "style": "dashed", "color": color, "penwidth": "2", **extra}
+
+# Graphviz attributes for the clusters drawn by the Python diagrams renderer.
+# Shared read-only across requests (see CLUSTER_GRAPH_ATTRS below); Cluster copies
+# them into its own graph.
+_CLUSTER_GRAPH_ATTR_DICTS = {
+    # Core platform clusters
+    "identity": _rounded_cluster("#e8f4f8"),
+    "management": _rounded_cluster("#f0f8ff"),
+    "network": _rounded_cluster("#f0fff0"),
+    # Hub-spoke VNets
+    "hub_vnet": _dashed_cluster("#e6f7ff", HUB_COLOR),
+    "production_spoke": _dashed_cluster("#fff7e6", SPOKE_COLOR),
+    "development_spoke": _dashed_cluster("#f0f8e6", DEV_SPOKE_COLOR),
+    # Spoke workload clusters
+    "compute": _dashed_cluster("#fff8dc", SPOKE_COLOR, label="Spoke Workloads"),
+    "storage": _dashed_cluster("#f5f5dc", SPOKE_COLOR),
+    "database": _dashed_cluster("#e6f3ff", SPOKE_COLOR),
+    # Shared service clusters
+    "analytics": _rounded_cluster("#f0e6ff"),
+    "integration": _rounded_cluster("#fff0e6"),
+    "devops": _rounded_cluster("#f5f5f5"),
+    "monitoring": _rounded_cluster("#e8f4f8"),
+}
+# Freeze the templates so a Cluster (or a caller) can never mutate the shared attributes
+CLUSTER_GRAPH_ATTRS = MappingProxyType({name: MappingProxyType(attrs) for name, attrs in _CLUSTER_GRAPH_ATTR_DICTS.items()})
+
+# Diagram-wide Graphviz attributes; Diagram merges them into its own graph, so one
+# read-only copy serves every request
+DIAGRAM_GRAPH_ATTRS = MappingProxyType({
+    "fontsize": "16",
+    "fontname": "Arial",
+    "rankdir": "TB",
+    "nodesep": "1.0",
+    "ranksep": "1.5",
+    "bgcolor": "#ffffff",
+    "margin": "0.5"
+})
+DIAGRAM_NODE_ATTRS = MappingProxyType({"fontsize": "12", "fontname": "Arial"})
+DIAGRAM_EDGE_ATTRS = MappingProxyType({"fontsize": "10", "fontname": "Arial"})
+
 def get_safe_output_directory() -> str:
     """Get a safe directory for output files with fallback options"""
     directories_to_try = [
@@ -415,9 +471,9 @@ def process_uploaded_document(file_content: bytes, filename: str, file_type: str
         # Extract text based on file type
         if file_type.lower() == 'pdf':
             text_content = extract_pdf_text(file_content)
-        elif file_type.lower() in ['xlsx', 'xls']:
+        elif file_type.lower() in ('xlsx', 'xls'):
             text_content = extract_excel_text(file_content)
-        elif file_type.lower() in ['pptx', 'ppt']:
+        elif file_type.lower() in ('pptx', 'ppt'):
             text_content = extract_pptx_text(file_content)
         else:
             return f"Unsupported file type: {file_type}"
@@ -558,6 +614,16 @@ def generate_ai_enhanced_recommendations(inputs: CustomerInputs, url_analysis: s
         logger.error(f"Error generating AI recommendations: {e}")
         return f"Error generating AI recommendations: {str(e)}"
 
+# Service selections converted to validation resources: (CustomerInputs field, category),
+# in the order their resources are numbered
+VALIDATED_SERVICE_CATEGORIES = (
+    ("compute_services", "compute"),
+    ("network_services", "network"),
+    ("storage_services", "storage"),
+    ("database_services", "database"),
+    ("security_services", "security"),
+)
+
 def convert_customer_inputs_to_architecture(inputs: CustomerInputs) -> Dict[str, Any]:
     """
     Convert CustomerInputs to the architecture format expected by the validation system.
@@ -591,160 +657,112 @@ def convert_customer_inputs_to_architecture(inputs: CustomerInputs) -> Dict[str,
             if key in reg_lower:
                 architecture["metadata"]["compliance_requirements"].append(value)
     
-    # Convert service selections to resources
-    resource_id_counter = 1
-    
-    # Process compute services
-    if inputs.compute_services:
-        for service in inputs.compute_services:
-            resource = _create_resource_from_service(service, "compute", resource_id_counter, inputs)
-            if resource:
-                architecture["resources"].append(resource)
-                resource_id_counter += 1
-    
-    # Process network services
-    if inputs.network_services:
-        for service in inputs.network_services:
-            resource = _create_resource_from_service(service, "network", resource_id_counter, inputs)
-            if resource:
-                architecture["resources"].append(resource)
-                resource_id_counter += 1
-    
-    # Process storage services
-    if inputs.storage_services:
-        for service in inputs.storage_services:
-            resource = _create_resource_from_service(service, "storage", resource_id_counter, inputs)
-            if resource:
-                architecture["resources"].append(resource)
-                resource_id_counter += 1
+    # Convert service selections to resources; ids follow the number of resources kept so far
+    resources = architecture["resources"]
     
-    # Process database services
-    if inputs.database_services:
-        for service in inputs.database_services:
-            resource = _create_resource_from_service(service, "database", resource_id_counter, inputs)
-            if resource:
-                architecture["resources"].append(resource)
-                resource_id_counter += 1
+    # Owner tag derived from the org structure once and shared by every resource
+    owner_tag = inputs.org_structure.lower().replace(" ", "") if inputs.org_structure else None
     
-    # Process security services
-    if inputs.security_services:
-        for service in inputs.security_services:
-            resource = _create_resource_from_service(service, "security", resource_id_counter, inputs)
+    for field_name, category in VALIDATED_SERVICE_CATEGORIES:
+        for service in getattr(inputs, field_name) or []:
+            resource = _create_resource_from_service(service, category, len(resources) + 1, inputs, owner_tag)
             if resource:
-                architecture["resources"].append(resource)
-                resource_id_counter += 1
+                resources.append(resource)
     
     return architecture
 
-def _create_resource_from_service(service: str, category: str, resource_id: int, inputs: CustomerInputs) -> Optional[Dict[str, Any]]:
+# Input levels that switch on the optional settings of the validation resource templates
+LOG_ANALYTICS_MONITORING = frozenset({"azure-monitor", "log-analytics"})
+CONTAINER_INSIGHTS_MONITORING = frozenset({"azure-monitor", "comprehensive"})
+APP_INSIGHTS_MONITORING = frozenset({"azure-monitor", "application-insights"})
+ZONE_REDUNDANT_SCALABILITY = frozenset({"high", "critical"})
+BACKUP_ENABLED_LEVELS = frozenset({"comprehensive", "standard"})
+
+def _firewall_base_config(inputs: CustomerInputs, category: str) -> Dict[str, Any]:
+    """Base validation config shared by the firewall service keys"""
+    return {
+        "hub_vnet": True,
+        "threat_intelligence": True,
+        "diagnostic_logs": inputs.monitoring in LOG_ANALYTICS_MONITORING
+    }
+
+# Validation resource templates: service key -> (resource type, base config builder).
+# Only the matched service's builder runs, so converting a selection does not
+# allocate the configs of every known service for each resource.
+RESOURCE_TEMPLATES = {
+    # Compute services
+    "virtual_machines": ("VM", lambda inputs, category: {
+        "subnet": "private-subnet" if inputs.security_posture == "zero-trust" else "public-subnet",
+        "vnet": f"spoke-{category}-vnet",
+        "availability_zones": inputs.scalability in ZONE_REDUNDANT_SCALABILITY,
+        "network_security_group": True,
+        "backup_enabled": inputs.backup in BACKUP_ENABLED_LEVELS,
+        "disk_encryption": True
+    }),
+    "aks": ("AKS", lambda inputs, category: {
+        "private_cluster": inputs.security_posture == "zero-trust",
+        "rbac_enabled": True,
+        "network_policy": inputs.security_posture == "zero-trust",
+        "container_insights": inputs.monitoring in CONTAINER_INSIGHTS_MONITORING
+    }),
+    "app_services": ("AppService", lambda inputs, category: {
+        "vnet_integration": inputs.security_posture == "zero-trust",
+        "private_endpoint": inputs.security_posture == "zero-trust",
+        "https_only": True,
+        "managed_identity": True,
+        "application_insights": inputs.monitoring in APP_INSIGHTS_MONITORING
+    }),
+    # Database services
+    "sql_database": ("SQL", lambda inputs, category: {
+        "public_access": inputs.security_posture != "zero-trust",
+        "private_endpoint": inputs.security_posture == "zero-trust",
+        "encryption_at_rest": True,
+        "encryption_in_transit": True,
+        "auditing": inputs.regulatory is not None,
+        "backup_retention_days": 30 if inputs.backup in BACKUP_ENABLED_LEVELS else 7
+    }),
+    "cosmos_db": ("CosmosDB", lambda inputs, category: {
+        "public_network_access": inputs.security_posture != "zero-trust",
+        "private_endpoint": inputs.security_posture == "zero-trust",
+        "encryption_at_rest": True,
+        "firewall_enabled": True
+    }),
+    # Storage services
+    "storage_accounts": ("Storage", lambda inputs, category: {
+        "public_blob_access": inputs.security_posture != "zero-trust",
+        "private_endpoint": inputs.security_posture == "zero-trust",
+        "https_only": True,
+        "min_tls_version": "1.2",
+        "storage_analytics": inputs.monitoring in LOG_ANALYTICS_MONITORING
+    }),
+    # Network services
+    "azure_firewall": ("Firewall", _firewall_base_config),
+    "firewall": ("Firewall", _firewall_base_config),
+    "key_vault": ("KeyVault", lambda inputs, category: {
+        "public_network_access": inputs.security_posture != "zero-trust",
+        "private_endpoint": inputs.security_posture == "zero-trust"
+    }),
+}
+
+def _create_resource_from_service(service: str, category: str, resource_id: int, inputs: CustomerInputs, owner_tag: Optional[str]) -> Optional[Dict[str, Any]]:
     """
     Create a resource configuration from a service string and customer inputs.
     """
     service_lower = service.lower().replace("-", "_").replace(" ", "_")
     
-    # Map service names to resource types and configurations
-    service_mappings = {
-        # Compute services
-        "virtual_machines": {
-            "type": "VM",
-            "base_config": {
-                "subnet": "private-subnet" if inputs.security_posture == "zero-trust" else "public-subnet",
-                "vnet": f"spoke-{category}-vnet",
-                "availability_zones": inputs.scalability in ["high", "critical"],
-                "network_security_group": True,
-                "backup_enabled": inputs.backup in ["comprehensive", "standard"],
-                "disk_encryption": True
-            }
-        },
-        "aks": {
-            "type": "AKS", 
-            "base_config": {
-                "private_cluster": inputs.security_posture == "zero-trust",
-                "rbac_enabled": True,
-                "network_policy": inputs.security_posture == "zero-trust",
-                "container_insights": inputs.monitoring in ["azure-monitor", "comprehensive"]
-            }
-        },
-        "app_services": {
-            "type": "AppService",
-            "base_config": {
-                "vnet_integration": inputs.security_posture == "zero-trust",
-                "private_endpoint": inputs.security_posture == "zero-trust",
-                "https_only": True,
-                "managed_identity": True,
-                "application_insights": inputs.monitoring in ["azure-monitor", "application-insights"]
-            }
-        },
-        # Database services
-        "sql_database": {
-            "type": "SQL",
-            "base_config": {
-                "public_access": inputs.security_posture != "zero-trust",
-                "private_endpoint": inputs.security_posture == "zero-trust", 
-                "encryption_at_rest": True,
-                "encryption_in_transit": True,
-                "auditing": inputs.regulatory is not None,
-                "backup_retention_days": 30 if inputs.backup in ["comprehensive", "standard"] else 7
-            }
-        },
-        "cosmos_db": {
-            "type": "CosmosDB",
-            "base_config": {
-                "public_network_access": inputs.security_posture != "zero-trust",
-                "private_endpoint": inputs.security_posture == "zero-trust",
-                "encryption_at_rest": True,
-                "firewall_enabled": True
-            }
-        },
-        # Storage services
-        "storage_accounts": {
-            "type": "Storage", 
-            "base_config": {
-                "public_blob_access": inputs.security_posture != "zero-trust",
-                "private_endpoint": inputs.security_posture == "zero-trust",
-                "https_only": True,
-                "min_tls_version": "1.2",
-                "storage_analytics": inputs.monitoring in ["azure-monitor", "log-analytics"]
-            }
-        },
-        # Network services
-        "azure_firewall": {
-            "type": "Firewall",
-            "base_config": {
-                "hub_vnet": True,
-                "threat_intelligence": True,
-                "diagnostic_logs": inputs.monitoring in ["azure-monitor", "log-analytics"]
-            }
-        },
-        "firewall": {
-            "type": "Firewall",
-            "base_config": {
-                "hub_vnet": True,
-                "threat_intelligence": True,
-                "diagnostic_logs": inputs.monitoring in ["azure-monitor", "log-analytics"]
-            }
-        },
-        "key_vault": {
-            "type": "KeyVault",
-            "base_config": {
-                "public_network_access": inputs.security_posture != "zero-trust",
-                "private_endpoint": inputs.security_posture == "zero-trust"
-            }
-        }
-    }
-    
-    if service_lower not in service_mappings:
+    template = RESOURCE_TEMPLATES.get(service_lower)
+    if template is None:
         logger.warning(f"Unknown service type: {service}")
         return None
     
-    mapping = service_mappings[service_lower]
+    resource_type, build_base_config = template
     resource_name = f"{service.replace('_', '-')}-{resource_id:02d}"
     
     # Create base resource structure
     resource = {
         "name": resource_name,
-        "type": mapping["type"],
-        **mapping["base_config"]
+        "type": resource_type,
+        **build_base_config(inputs, category)
     }
     
     # Add common tags based on inputs
@@ -753,9 +771,9 @@ def _create_resource_from_service(service: str, category: str, resource_id: int,
         "project": inputs.business_objective or "azure-landing-zone"
     }
     
-    # Add owner tag if we can derive it from org structure
-    if inputs.org_structure:
-        resource["tags"]["owner"] = inputs.org_structure.lower().replace(" ", "")
+    # Add owner tag if one was derived from the org structure
+    if owner_tag is not None:
+        resource["tags"]["owner"] = owner_tag
     
     # Apply security posture configurations
     if inputs.security_posture == "zero-trust":
@@ -765,6 +783,10 @@ def _create_resource_from_service(service: str, category: str, resource_id: int,
     
     return resource
 
+# Resource types that get a firewall under each security posture
+ZERO_TRUST_FIREWALLED_TYPES = frozenset({"SQL", "CosmosDB", "Storage"})
+DEFENSE_IN_DEPTH_FIREWALLED_TYPES = frozenset({"SQL", "Storage"})
+
 def _apply_zero_trust_config(resource: Dict[str, Any]) -> None:
     """Apply zero trust security configurations to a resource"""
     resource_type = resource.get("type", "")
@@ -783,7 +805,7 @@ def _apply_zero_trust_config(resource: Dict[str, Any]) -> None:
     # Type-specific zero trust configurations
     if resource_type == "VM":
         resource["subnet"] = "private-subnet"
-    elif resource_type in ["SQL", "CosmosDB", "Storage"]:
+    elif resource_type in ZERO_TRUST_FIREWALLED_TYPES:
         resource["firewall_enabled"] = True
 
 def _apply_defense_in_depth_config(resource: Dict[str, Any]) -> None:
@@ -794,7 +816,7 @@ def _apply_defense_in_depth_config(resource: Dict[str, Any]) -> None:
     if resource_type == "VM":
         resource["network_security_group"] = True
         resource["vulnerability_assessment"] = True
-    elif resource_type in ["SQL", "Storage"]:
+    elif resource_type in DEFENSE_IN_DEPTH_FIREWALLED_TYPES:
         resource["firewall_rules"] = "restrictive"
 
 def validate_customer_inputs(inputs: CustomerInputs) -> None:
@@ -871,16 +893,14 @@ def _ensure_enterprise_resources_included(inputs: CustomerInputs) -> CustomerInp
     if not _should_include_enterprise_resources(inputs, enterprise_resources):
         return inputs
     
-    # Create a copy of inputs to modify
-    modified_inputs = inputs.model_copy()
-    
-    # Ensure lists are initialized
-    if not modified_inputs.security_services:
-        modified_inputs.security_services = []
-    if not modified_inputs.network_services:
-        modified_inputs.network_services = []
-    if not modified_inputs.monitoring_services:
-        modified_inputs.monitoring_services = []
+    # Create a copy of inputs to modify. model_copy() is shallow, so the service
+    # lists are copied as well to avoid mutating the caller's request object
+    # (repeated calls on the same inputs would otherwise accumulate state).
+    modified_inputs = inputs.model_copy(update={
+        "security_services": list(inputs.security_services or []),
+        "network_services": list(inputs.network_services or []),
+        "monitoring_services": list(inputs.monitoring_services or []),
+    })
     
     # Add missing enterprise resources
     if "key_vault" not in modified_inputs.security_services:
@@ -907,6 +927,13 @@ def _get_user_prompt_for_enterprise_resources() -> str:
             "Firewall, Azure Monitor) in every diagram, or only when not specified? "
             "Should connections between these resources and VM/VNet be explicitly shown?")
 
+# Edge factories for the connections drawn to both spoke VNets. Each call still builds
+# a fresh Edge, since diagrams binds an edge to the pair of nodes it joins.
+SECRETS_EDGE = partial(Edge, label="Secrets", style="bold", color="orange")
+AUTHENTICATION_EDGE = partial(Edge, label="Authentication", style="bold", color="blue")
+SECURE_ROUTING_EDGE = partial(Edge, label="Secure Routing", style="bold", color="red")
+RETURN_TRAFFIC_EDGE = partial(Edge, label="Return Traffic", style="dashed", color="red")
+
 def _add_enterprise_resource_connections(inputs: CustomerInputs, hub_vnet, prod_vnet, dev_vnet, aad, key_vault, network_services):
     """Add comprehensive connections between enterprise resources and infrastructure components"""
     logger.info("Adding enhanced enterprise resource connections")
@@ -928,10 +955,13 @@ def _add_enterprise_resource_connections(inputs: CustomerInputs, hub_vnet, prod_
             elif 'LoadBalancer' in ns._name or 'Balancer' in ns._name:
                 load_balancer = ns
     
+    # The security edges below target both spoke VNets alike
+    spoke_vnets = (prod_vnet, dev_vnet)
+    
     # 1. Core Security Connections - Key Vault to all environments
     try:
-        key_vault >> Edge(label="Secrets", style="bold", color="orange") >> prod_vnet
-        key_vault >> Edge(label="Secrets", style="bold", color="orange") >> dev_vnet
+        for spoke_vnet in spoke_vnets:
+            key_vault >> SECRETS_EDGE() >> spoke_vnet
         if hub_vnet:
             key_vault >> Edge(label="Hub Secrets", style="bold", color="orange") >> hub_vnet
         logger.debug("Connected Key Vault to all VNets with labeled connections")
@@ -940,8 +970,8 @@ def _add_enterprise_resource_connections(inputs: CustomerInputs, hub_vnet, prod_
     
     # 2. Identity Connections - Azure AD to all environments
     try:
-        aad >> Edge(label="Authentication", style="bold", color="blue") >> prod_vnet
-        aad >> Edge(label="Authentication", style="bold", color="blue") >> dev_vnet
+        for spoke_vnet in spoke_vnets:
+            aad >> AUTHENTICATION_EDGE() >> spoke_vnet
         if hub_vnet:
             aad >> Edge(label="Hub Identity", style="bold", color="blue") >> hub_vnet
         logger.debug("Connected Active Directory to all VNets with authentication labels")
@@ -952,12 +982,12 @@ def _add_enterprise_resource_connections(inputs: CustomerInputs, hub_vnet, prod_
     if firewall_service:
         try:
             # Firewall as central security gateway
-            firewall_service >> Edge(label="Secure Routing", style="bold", color="red") >> prod_vnet
-            firewall_service >> Edge(label="Secure Routing", style="bold", color="red") >> dev_vnet
+            for spoke_vnet in spoke_vnets:
+                firewall_service >> SECURE_ROUTING_EDGE() >> spoke_vnet
             
             # Bi-directional traffic flow indication
-            prod_vnet >> Edge(label="Return Traffic", style="dashed", color="red") >> firewall_service
-            dev_vnet >> Edge(label="Return Traffic", style="dashed", color="red") >> firewall_service
+            for spoke_vnet in spoke_vnets:
+                spoke_vnet >> RETURN_TRAFFIC_EDGE() >> firewall_service
             logger.debug("Connected Firewall with bi-directional traffic flow")
         except Exception as e:
             logger.debug(f"Firewall connection to VNets: {e}")
@@ -1007,69 +1037,74 @@ def _add_enterprise_resource_connections(inputs: CustomerInputs, hub_vnet, prod_
     
     logger.info("Enhanced enterprise resource connections completed")
 
+# Declarative service-to-service edge table: (source group, target group, label, style, color).
+# Groups are keys of the node lookup built in _add_service_to_service_connections;
+# "aad" and "key_vault" refer to the shared identity and secrets nodes.
+SERVICE_CONNECTION_SPECS = (
+    # Compute to Storage/Database - data persistence and application data patterns
+    ("compute_services", "storage_services", "Data Storage", "solid", "darkgreen"),
+    ("compute_services", "database_services", "Database Access", "bold", "darkblue"),
+    # Identity Integration - all services need authentication
+    ("aad", "compute_services", "Service Identity", "dotted", "blue"),
+    ("aad", "database_services", "Data Access Control", "dotted", "blue"),
+    ("aad", "storage_services", "Storage Access Control", "dotted", "blue"),
+    # Key Vault Integration - secrets, connection strings and access keys
+    ("key_vault", "compute_services", "App Secrets", "dashed", "orange"),
+    ("key_vault", "database_services", "DB Connection Strings", "dashed", "orange"),
+    ("key_vault", "storage_services", "Storage Keys", "dashed", "orange"),
+)
+
+# Analytics Integration - data flows into each analytics node: (source group, label).
+# Drawn per analytics node (storage, then databases) so Graphviz sees the edges in
+# the same declaration order as before and the rendered layout is unchanged.
+ANALYTICS_SOURCE_SPECS = (
+    ("storage_services", "Analytics Data"),
+    ("database_services", "Data Pipeline"),
+)
+
+# Service tiers watched by every monitoring service, with their edge labels
+MONITORED_TIERS = (
+    ("compute_services", "Monitoring"),
+    ("database_services", "DB Monitoring"),
+    ("storage_services", "Storage Monitoring"),
+)
+
+def _connect_pairs(sources, targets, label: str, style: str, color: str):
+    """Connect every source node to every target node with the given edge attributes"""
+    for source, target in product(sources, targets):
+        source >> Edge(label=label, style=style, color=color) >> target
+
 def _add_service_to_service_connections(inputs: CustomerInputs, service_collections, aad, key_vault):
     """Add intelligent connections between different service tiers with comprehensive patterns"""
     logger.info("Adding service-to-service connections")
     
-    # Extract service collections
-    compute_services = service_collections.get('compute_services', [])
-    storage_services = service_collections.get('storage_services', [])
-    database_services = service_collections.get('database_services', [])
-    analytics_services = service_collections.get('analytics_services', [])
-    monitoring_services = service_collections.get('monitoring_services', [])
+    # Share the tier buckets built by _add_service_clusters (every tier key is always
+    # present there) and add the shared identity/secrets nodes alongside them
+    node_groups = {
+        **service_collections,
+        'aad': [aad] if aad else [],
+        'key_vault': [key_vault] if key_vault else [],
+    }
     
     try:
-        # 1. Compute to Storage Connections - Data persistence patterns
-        if compute_services and storage_services:
-            for compute in compute_services:
-                for storage in storage_services:
-                    compute >> Edge(label="Data Storage", style="solid", color="darkgreen") >> storage
-                    logger.debug(f"Connected {compute} to {storage} for data persistence")
-        
-        # 2. Compute to Database Connections - Application data patterns
-        if compute_services and database_services:
-            for compute in compute_services:
-                for database in database_services:
-                    compute >> Edge(label="Database Access", style="bold", color="darkblue") >> database
-                    logger.debug(f"Connected {compute} to {database} for application data")
-        
-        # 3. Identity Integration - All services need authentication
-        if aad:
-            # Connect identity to compute services
-            for compute in compute_services:
-                aad >> Edge(label="Service Identity", style="dotted", color="blue") >> compute
-            
-            # Connect identity to data services for access control
-            for database in database_services:
-                aad >> Edge(label="Data Access Control", style="dotted", color="blue") >> database
-            
-            for storage in storage_services:
-                aad >> Edge(label="Storage Access Control", style="dotted", color="blue") >> storage
-        
-        # 4. Key Vault Integration - Secrets management for all services
-        if key_vault:
-            # Connect Key Vault to compute services for application secrets
-            for compute in compute_services:
-                key_vault >> Edge(label="App Secrets", style="dashed", color="orange") >> compute
-            
-            # Connect Key Vault to databases for connection strings and keys
-            for database in database_services:
-                key_vault >> Edge(label="DB Connection Strings", style="dashed", color="orange") >> database
-            
-            # Connect Key Vault to storage for access keys
-            for storage in storage_services:
-                key_vault >> Edge(label="Storage Keys", style="dashed", color="orange") >> storage
+        # Drop patterns with an empty side up front; with no service tiers drawn the
+        # wiring below has nothing to do and falls through to the completion log
+        active_specs = [spec for spec in SERVICE_CONNECTION_SPECS if node_groups[spec[0]] and node_groups[spec[1]]]
+        analytics_services = node_groups['analytics_services']
+        has_analytics_sources = any(node_groups[source_key] for source_key, _ in ANALYTICS_SOURCE_SPECS)
+        if not active_specs and not (analytics_services and has_analytics_sources):
+            logger.info("No populated service tiers to connect")
+        
+        # 1-4. Tier-to-tier patterns driven by SERVICE_CONNECTION_SPECS in a single pass
+        for source_key, target_key, label, style, color in active_specs:
+            _connect_pairs(node_groups[source_key], node_groups[target_key], label, style, color)
+            logger.debug(f"Connected {source_key} to {target_key} ({label})")
         
         # 5. Analytics Integration Patterns - Data flows to analytics
-        if analytics_services:
-            for analytics in analytics_services:
-                # Analytics consume data from storage
-                for storage in storage_services:
-                    storage >> Edge(label="Analytics Data", style="bold", color="purple") >> analytics
-                # Analytics consume data from databases
-                for database in database_services:
-                    database >> Edge(label="Data Pipeline", style="bold", color="purple") >> analytics
-                logger.debug(f"Connected data sources to {analytics}")
+        for analytics in analytics_services:
+            for source_key, label in ANALYTICS_SOURCE_SPECS:
+                for source in node_groups[source_key]:
+                    source >> Edge(label=label, style="bold", color="purple") >> analytics
         
         # 6. AI/ML Service Integration
         if inputs.ai_services:
@@ -1160,29 +1195,15 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
                 show=False, 
                 direction="TB",
                 outformat=output_format,
-                graph_attr={
-                    "fontsize": "16",
-                    "fontname": "Arial",
-                    "rankdir": "TB",
-                    "nodesep": "1.0",
-                    "ranksep": "1.5",
-                    "bgcolor": "#ffffff",
-                    "margin": "0.5"
-                },
-                node_attr={
-                    "fontsize": "12",
-                    "fontname": "Arial"
-                },
-                edge_attr={
-                    "fontsize": "10",
-                    "fontname": "Arial"
-                }
+                graph_attr=DIAGRAM_GRAPH_ATTRS,
+                node_attr=DIAGRAM_NODE_ATTRS,
+                edge_attr=DIAGRAM_EDGE_ATTRS
             ):
                 
                 logger.info("Creating diagram structure...")
                 
                 # Core Identity and Security Services
-                with Cluster("Identity & Security", graph_attr={"bgcolor": "#e8f4f8", "style": "rounded"}):
+                with Cluster("Identity & Security", graph_attr=CLUSTER_GRAPH_ATTRS["identity"]):
                     aad = ActiveDirectory("Azure Active Directory")
                     key_vault = KeyVaults("Key Vault")
                     if inputs.security_services and "security_center" in inputs.security_services:
@@ -1191,7 +1212,7 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
                         sentinel = Sentinel("Sentinel")
                 
                 # Management Groups and Subscriptions Structure
-                with Cluster("Management & Governance", graph_attr={"bgcolor": "#f0f8ff", "style": "rounded"}):
+                with Cluster("Management & Governance", graph_attr=CLUSTER_GRAPH_ATTRS["management"]):
                     root_mg = Subscriptions("Root Management Group")
                     if template['template']['name'] == "Enterprise Scale Landing Zone":
                         platform_mg = Subscriptions("Platform MG")
@@ -1203,24 +1224,13 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
                         root_mg >> [platform_mg, workloads_mg]
                 
                 # Hub-Spoke Network Architecture with Enhanced Visualization
-                with Cluster("Network Architecture", graph_attr={"bgcolor": "#f0fff0", "style": "rounded"}):
+                with Cluster("Network Architecture", graph_attr=CLUSTER_GRAPH_ATTRS["network"]):
                     # Hub VNet with dashed border to indicate central hub
-                    with Cluster("Hub VNet", graph_attr={
-                        "bgcolor": "#e6f7ff", 
-                        "style": "dashed", 
-                        "color": "#0078d4",
-                        "penwidth": "2"
-                    }):
+                    with Cluster("Hub VNet", graph_attr=CLUSTER_GRAPH_ATTRS["hub_vnet"]):
                         hub_vnet = VirtualNetworks("Hub VNet\n(Shared Services)")
                         
                         # Network services based on selections - these go in the hub
-                        network_services = []
-                        if inputs.network_services:
-                            for service in inputs.network_services:
-                                if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                                    diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                                    service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                                    network_services.append(diagram_class(service_name))
+                        network_services = _service_nodes(_diagram_services(inputs.network_services))
                         
                         # Default network services if none specified
                         if not network_services:
@@ -1230,28 +1240,18 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
                         
                         # Connect network services within hub
                         for ns in network_services:
-                            hub_vnet >> Edge(style="solid", color="#0078d4") >> ns
+                            hub_vnet >> Edge(style="solid", color=HUB_COLOR) >> ns
                     
                     # Spoke VNets with dashed borders to indicate spokes
-                    with Cluster("Production Spoke", graph_attr={
-                        "bgcolor": "#fff7e6", 
-                        "style": "dashed", 
-                        "color": "#d83b01",
-                        "penwidth": "2"
-                    }):
+                    with Cluster("Production Spoke", graph_attr=CLUSTER_GRAPH_ATTRS["production_spoke"]):
                         prod_vnet = VirtualNetworks("Production VNet")
                     
-                    with Cluster("Development Spoke", graph_attr={
-                        "bgcolor": "#f0f8e6", 
-                        "style": "dashed", 
-                        "color": "#107c10",
-                        "penwidth": "2"
-                    }):
+                    with Cluster("Development Spoke", graph_attr=CLUSTER_GRAPH_ATTRS["development_spoke"]):
                         dev_vnet = VirtualNetworks("Development VNet")
                     
                     # Connect hub to spokes with dashed lines to show hub-spoke topology
-                    hub_vnet >> Edge(style="dashed", color="#666666", label="Hub-Spoke\nConnection") >> prod_vnet
-                    hub_vnet >> Edge(style="dashed", color="#666666", label="Hub-Spoke\nConnection") >> dev_vnet
+                    hub_vnet >> Edge(style="dashed", color=LINK_COLOR, label="Hub-Spoke\nConnection") >> prod_vnet
+                    hub_vnet >> Edge(style="dashed", color=LINK_COLOR, label="Hub-Spoke\nConnection") >> dev_vnet
                     
                     # Connect platform subscription to hub
                     platform_mg >> hub_vnet
@@ -1276,17 +1276,16 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
                 )
                 
                 # Add monitoring connections to all services (monitoring everything)
-                if service_collections.get('monitoring_services'):
-                    for monitor in service_collections['monitoring_services']:
-                        # Monitor all compute services
-                        for compute in service_collections.get('compute_services', []):
-                            monitor >> Edge(label="Monitoring", style="dotted", color="green") >> compute
-                        # Monitor all databases  
-                        for database in service_collections.get('database_services', []):
-                            monitor >> Edge(label="DB Monitoring", style="dotted", color="green") >> database
-                        # Monitor all storage
-                        for storage in service_collections.get('storage_services', []):
-                            monitor >> Edge(label="Storage Monitoring", style="dotted", color="green") >> storage
+                # (compute, then databases, then storage; empty tiers contribute no targets)
+                monitors = service_collections['monitoring_services']
+                monitored = [
+                    (target, label)
+                    for tier, label in MONITORED_TIERS
+                    for target in service_collections[tier]
+                ]
+                if monitors and monitored:
+                    for monitor, (target, label) in product(monitors, monitored):
+                        monitor >> Edge(label=label, style="dotted", color="green") >> target
                 
                 logger.info("Diagram structure created successfully")
         
@@ -1341,6 +1340,10 @@ def generate_azure_architecture_diagram(inputs: CustomerInputs, output_dir: str
         logger.error(traceback.format_exc())
         raise
 
+def _service_display_name(service: str) -> str:
+    """Readable label for a service key, e.g. 'app_services' -> 'App Services'"""
+    return service.replace('_', ' ').title()
+
 def generate_simple_svg_diagram(inputs: CustomerInputs) -> str:
     """Generate a simple SVG diagram as fallback when Python Diagrams fails"""
     
@@ -1430,13 +1433,12 @@ def generate_simple_svg_diagram(inputs: CustomerInputs) -> str:
     <rect x="70" y="{y_offset}" width="300" height="80" class="service-box" rx="5"/>
     <text x="80" y="{y_offset + 20}" class="group-title">Compute Services</text>'''
         
-        x_pos = 80
-        for i, service in enumerate(inputs.compute_services[:4]):  # Max 4 services
-            service_name = service.replace('_', ' ').title()
+        # (zip with the four slot positions caps the row at 4 services without copying the list)
+        for x_pos, service in zip(range(80, 360, 70), inputs.compute_services):  # Max 4 services
+            service_name = _service_display_name(service)
             svg_content += f'''
     <rect x="{x_pos}" y="{y_offset + 30}" width="60" height="25" class="service-box" rx="3"/>
     <text x="{x_pos + 30}" y="{y_offset + 47}" class="service" text-anchor="middle" font-size="10">{service_name[:8]}</text>'''
-            x_pos += 70
     
     if inputs.network_services:
         svg_content += f'''
@@ -1444,13 +1446,11 @@ def generate_simple_svg_diagram(inputs: CustomerInputs) -> str:
     <rect x="390" y="{y_offset}" width="300" height="80" class="network-box" rx="5"/>
     <text x="400" y="{y_offset + 20}" class="group-title">Network Services</text>'''
         
-        x_pos = 400
-        for i, service in enumerate(inputs.network_services[:4]):  # Max 4 services
-            service_name = service.replace('_', ' ').title()
+        for x_pos, service in zip(range(400, 680, 70), inputs.network_services):  # Max 4 services
+            service_name = _service_display_name(service)
             svg_content += f'''
     <rect x="{x_pos}" y="{y_offset + 30}" width="60" height="25" class="network-box" rx="3"/>
     <text x="{x_pos + 30}" y="{y_offset + 47}" class="service" text-anchor="middle" font-size="10">{service_name[:8]}</text>'''
-            x_pos += 70
     
     # Security Services
     y_offset += 100
@@ -1487,6 +1487,35 @@ def generate_simple_svg_diagram(inputs: CustomerInputs) -> str:
     
     return svg_content
 
+def _unique_services(services: Optional[List[str]]) -> List[str]:
+    """Drop repeated service keys (keeping first-seen order) so each service is drawn and wired once"""
+    return list(dict.fromkeys(services or []))
+
+def _diagram_services(services: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Mapping entries for the selected services that have an Azure icon to draw"""
+    mapped = (AZURE_SERVICES_MAPPING.get(service) for service in _unique_services(services))
+    return [info for info in mapped if info and info["diagram_class"]]
+
+def _service_nodes(entries: List[Dict[str, Any]]) -> list:
+    """Build the diagram node for each mapping entry, in one pass"""
+    return [info["diagram_class"](info["name"]) for info in entries]
+
+# Service tier clusters drawn without fallbacks, in drawing order:
+# (input field, cluster label, CLUSTER_GRAPH_ATTRS key, keep nodes for connectivity,
+#  edge from the production VNet or None for no link, edge from the workloads
+#  management group or None for a plain link)
+SERVICE_TIER_CLUSTERS = (
+    ("database_services", "Databases (Spoke)", "database", True,
+     partial(Edge, style="dashed", color=SPOKE_COLOR, label="Spoke\nDatabase"),
+     partial(Edge, style="dotted", color=LINK_COLOR)),
+    ("analytics_services", "Analytics & AI", "analytics", True,
+     partial(Edge, label="Analytics Data", style="solid", color="purple"), None),
+    ("integration_services", "Integration", "integration", False,
+     partial(Edge, label="Integration Flow", style="solid", color="teal"), None),
+    ("devops_services", "DevOps & Automation", "devops", False,
+     None, partial(Edge, label="CI/CD Pipeline", style="dotted", color="gray")),
+)
+
 def _add_service_clusters(inputs: CustomerInputs, prod_vnet, workloads_mg):
     """Helper method to add service clusters to avoid code duplication and return service references for connectivity"""
     service_collections = {
@@ -1500,30 +1529,13 @@ def _add_service_clusters(inputs: CustomerInputs, prod_vnet, workloads_mg):
     try:
         # Compute and Application Services - These go in the spoke with enhanced visualization
         if inputs.compute_services or inputs.workload:
-            with Cluster("Compute & Applications (Spoke)", graph_attr={
-                "bgcolor": "#fff8dc", 
-                "style": "dashed", 
-                "color": "#d83b01",
-                "penwidth": "2",
-                "label": "Spoke Workloads"
-            }):
-                compute_services = []
-                
+            with Cluster("Compute & Applications (Spoke)", graph_attr=CLUSTER_GRAPH_ATTRS["compute"]):
                 # Add selected compute services
-                if inputs.compute_services:
-                    for service in inputs.compute_services:
-                        if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                            diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                            service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                            service_instance = diagram_class(service_name)
-                            compute_services.append(service_instance)
+                compute_services = _service_nodes(_diagram_services(inputs.compute_services))
                 
                 # Fallback to workload if no specific compute services
                 if not compute_services and inputs.workload:
-                    if inputs.workload in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[inputs.workload]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[inputs.workload]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[inputs.workload]["name"]
-                        compute_services.append(diagram_class(service_name))
+                    compute_services = _service_nodes(_diagram_services([inputs.workload]))
                 
                 # Default to App Services if nothing specified
                 if not compute_services:
@@ -1534,24 +1546,13 @@ def _add_service_clusters(inputs: CustomerInputs, prod_vnet, workloads_mg):
                 
                 # Connect compute services to production VNet with enhanced labels
                 for cs in compute_services:
-                    prod_vnet >> Edge(style="dashed", color="#d83b01", label="Spoke\nWorkload") >> cs
-                    workloads_mg >> Edge(style="dotted", color="#666666") >> cs
+                    prod_vnet >> Edge(style="dashed", color=SPOKE_COLOR, label="Spoke\nWorkload") >> cs
+                    workloads_mg >> Edge(style="dotted", color=LINK_COLOR) >> cs
         
         # Storage Services - Also in spoke
         if inputs.storage_services:
-            with Cluster("Storage & Data (Spoke)", graph_attr={
-                "bgcolor": "#f5f5dc", 
-                "style": "dashed", 
-                "color": "#d83b01",
-                "penwidth": "2"
-            }):
-                storage_services = []
-                for service in inputs.storage_services:
-                    if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                        service_instance = diagram_class(service_name)
-                        storage_services.append(service_instance)
+            with Cluster("Storage & Data (Spoke)", graph_attr=CLUSTER_GRAPH_ATTRS["storage"]):
+                storage_services = _service_nodes(_diagram_services(inputs.storage_services))
                 
                 if not storage_services:
                     storage_services.append(StorageAccounts("Storage Accounts"))
@@ -1561,91 +1562,40 @@ def _add_service_clusters(inputs: CustomerInputs, prod_vnet, workloads_mg):
                 
                 # Connect storage to production VNet with enhanced labels
                 for ss in storage_services:
-                    prod_vnet >> Edge(style="dashed", color="#d83b01", label="Spoke\nData") >> ss
-                    workloads_mg >> Edge(style="dotted", color="#666666") >> ss
-        
-        # Database Services - Also in spoke
-        if inputs.database_services:
-            with Cluster("Databases (Spoke)", graph_attr={
-                "bgcolor": "#e6f3ff", 
-                "style": "dashed", 
-                "color": "#d83b01",
-                "penwidth": "2"
-            }):
-                database_services = []
-                for service in inputs.database_services:
-                    if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                        service_instance = diagram_class(service_name)
-                        database_services.append(service_instance)
+                    prod_vnet >> Edge(style="dashed", color=SPOKE_COLOR, label="Spoke\nData") >> ss
+                    workloads_mg >> Edge(style="dotted", color=LINK_COLOR) >> ss
+        
+        # Database, analytics, integration and DevOps clusters, driven by SERVICE_TIER_CLUSTERS
+        # (each is only opened when a selected service has an icon to draw)
+        for field_name, label, attrs_key, collect, vnet_edge, mg_edge in SERVICE_TIER_CLUSTERS:
+            tier_entries = _diagram_services(getattr(inputs, field_name))
+            if not tier_entries:
+                continue
+            with Cluster(label, graph_attr=CLUSTER_GRAPH_ATTRS[attrs_key]):
+                tier_nodes = _service_nodes(tier_entries)
                 
                 # Store for connectivity
-                service_collections['database_services'] = database_services
+                if collect:
+                    service_collections[field_name] = tier_nodes
                 
-                # Connect databases to production VNet with enhanced labels
-                for ds in database_services:
-                    prod_vnet >> Edge(style="dashed", color="#d83b01", label="Spoke\nDatabase") >> ds
-                    workloads_mg >> Edge(style="dotted", color="#666666") >> ds
-        
-        # Analytics Services
-        if inputs.analytics_services:
-            with Cluster("Analytics & AI", graph_attr={"bgcolor": "#f0e6ff", "style": "rounded"}):
-                analytics_services = []
-                for service in inputs.analytics_services:
-                    if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                        service_instance = diagram_class(service_name)
-                        analytics_services.append(service_instance)
-                
-                # Store for connectivity
-                service_collections['analytics_services'] = analytics_services
-                
-                # Connect analytics to production VNet and workloads with data flow labels
-                for as_service in analytics_services:
-                    prod_vnet >> Edge(label="Analytics Data", style="solid", color="purple") >> as_service
-                    workloads_mg >> as_service
-        
-        # Integration Services
-        if inputs.integration_services:
-            with Cluster("Integration", graph_attr={"bgcolor": "#fff0e6", "style": "rounded"}):
-                integration_services = []
-                for service in inputs.integration_services:
-                    if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                        integration_services.append(diagram_class(service_name))
-                
-                # Connect integration services to production VNet and workloads
-                for is_service in integration_services:
-                    prod_vnet >> Edge(label="Integration Flow", style="solid", color="teal") >> is_service
-                    workloads_mg >> is_service
-        
-        # DevOps Services  
-        if inputs.devops_services:
-            with Cluster("DevOps & Automation", graph_attr={"bgcolor": "#f5f5f5", "style": "rounded"}):
-                devops_services = []
-                for service in inputs.devops_services:
-                    if service in AZURE_SERVICES_MAPPING and AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                        diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                        service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                        devops_services.append(diagram_class(service_name))
-                
-                # Connect DevOps services to management
-                for ds in devops_services:
-                    workloads_mg >> Edge(label="CI/CD Pipeline", style="dotted", color="gray") >> ds
+                # Connect to the production VNet and the workloads management group
+                for node in tier_nodes:
+                    if vnet_edge:
+                        prod_vnet >> vnet_edge() >> node
+                    if mg_edge:
+                        workloads_mg >> mg_edge() >> node
+                    else:
+                        workloads_mg >> node
         
         # Monitoring & Management Services
         if inputs.monitoring_services:
-            with Cluster("Monitoring & Observability", graph_attr={"bgcolor": "#e8f4f8", "style": "rounded"}):
+            with Cluster("Monitoring & Observability", graph_attr=CLUSTER_GRAPH_ATTRS["monitoring"]):
                 monitoring_services_list = []
-                for service in inputs.monitoring_services:
-                    if service in AZURE_SERVICES_MAPPING:
-                        if AZURE_SERVICES_MAPPING[service]["diagram_class"]:
-                            diagram_class = AZURE_SERVICES_MAPPING[service]["diagram_class"]
-                            service_name = AZURE_SERVICES_MAPPING[service]["name"]
-                            service_instance = diagram_class(service_name)
+                for service in _unique_services(inputs.monitoring_services):
+                    service_info = AZURE_SERVICES_MAPPING.get(service)
+                    if service_info:
+                        if service_info["diagram_class"]:
+                            service_instance = service_info["diagram_class"](service_info["name"])
                             monitoring_services_list.append(service_instance)
                         else:
                             logger.info(f"Monitoring service '{service}' included but no visual diagram component available")
@@ -1665,13 +1615,17 @@ def _add_service_clusters(inputs: CustomerInputs, prod_vnet, workloads_mg):
     return service_collections
 
 
+def _template_slug(name: str) -> str:
+    """Slug a management group/subscription name for draw.io ids and LLD resource names"""
+    return name.lower().replace(' ', '-')
+
 def generate_architecture_template(inputs: CustomerInputs) -> Dict[str, Any]:
     """Generate architecture template based on inputs"""
     
     # Determine organization size and template
     if inputs.org_structure and "enterprise" in inputs.org_structure.lower():
         template = AZURE_TEMPLATES["enterprise"]
-    elif inputs.org_structure and any(x in inputs.org_structure.lower() for x in ["small", "medium", "sme"]):
+    elif inputs.org_structure and any(x in inputs.org_structure.lower() for x in ("small", "medium", "sme")):
         template = AZURE_TEMPLATES["small_medium"]
     else:
         template = AZURE_TEMPLATES["startup"]
@@ -1689,6 +1643,60 @@ def generate_architecture_template(inputs: CustomerInputs) -> Dict[str, Any]:
     
     return components
 
+def _mermaid_id(service: str) -> str:
+    """Mermaid node id for a service key, e.g. 'security_center' -> 'SECURITYCENTER'"""
+    return service.upper().replace('_', '')
+
+def _mermaid_service_nodes(services: List[str], caption: str, id_prefix: str = "") -> List[str]:
+    """Mermaid node lines for the mapped services, in input order, built in one comprehension"""
+    mapped = ((service, AZURE_SERVICES_MAPPING.get(service)) for service in services)
+    return [
+        f"                {id_prefix}{_mermaid_id(service)}[\"{info['icon']} {info['name']}<br/>{caption}\"]"
+        for service, info in mapped if info
+    ]
+
+# Service keys drawn in the Mermaid hub as security monitors, gateways and hybrid links
+SECURITY_MONITOR_SERVICES = frozenset({"security_center", "sentinel", "defender"})
+GATEWAY_SERVICES = frozenset({"application_gateway", "load_balancer", "vpn_gateway"})
+HYBRID_GATEWAY_SERVICES = frozenset({"expressroute", "vpn_gateway"})
+
+# Mermaid node ids of the spoke VNets, in the order their edges are emitted
+SPOKE_VNET_IDS = ("PRODVNET", "DEVVNET")
+
+# Database service -> Mermaid connectivity lines drawn for each selected database
+MERMAID_DATABASE_LINKS = MappingProxyType({
+    "sql_database": (
+        "        %% SQL Database Connections",
+        "        FIREWALL -->|\"Database Security\"| PROD_SQLDATABASE",
+        "        KEYVAULT -.->|\"Connection Strings\"| PROD_SQLDATABASE",
+        "        AAD -.->|\"Database Authentication\"| PROD_SQLDATABASE",
+    ),
+    "cosmos_db": (
+        "        %% Cosmos DB Connections",
+        "        FIREWALL -->|\"NoSQL Security\"| PROD_COSMOSDB",
+        "        AAD -.->|\"Cosmos Authentication\"| PROD_COSMOSDB",
+    ),
+})
+
+# Compute service -> Mermaid edge to the SQL database, storage and DevOps nodes
+SQL_COMPUTE_LINKS = MappingProxyType({
+    "virtual_machines": "        PROD_VIRTUALMACHINES -->|\"Application Data\"| PROD_SQLDATABASE",
+    "app_services": "        PROD_APPSERVICES -->|\"Application Data\"| PROD_SQLDATABASE",
+})
+STORAGE_COMPUTE_LINKS = MappingProxyType({
+    "virtual_machines": "        PROD_VIRTUALMACHINES -->|\"Data Storage\"| PROD_STORAGEACCOUNTS",
+    "app_services": "        PROD_APPSERVICES -->|\"App Data\"| PROD_STORAGEACCOUNTS",
+})
+DEVOPS_COMPUTE_LINKS = MappingProxyType({
+    "virtual_machines": "        DEVOPS -->|\"VM Deployment\"| PROD_VIRTUALMACHINES",
+    "app_services": "        DEVOPS -->|\"App Deployment\"| PROD_APPSERVICES",
+    "aks": "        DEVOPS -->|\"Container Deployment\"| PROD_AKS",
+})
+
+def _compute_links(compute_services: Optional[List[str]], links: Dict[str, str]):
+    """Edge lines for the selected compute services that have one in links, in input order"""
+    return (link for compute in compute_services or () if (link := links.get(compute)))
+
 def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     """Generate professional Mermaid diagram for Azure Landing Zone with Hub-and-Spoke architecture"""
     
@@ -1707,7 +1715,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     ]
     
     # Add ExpressRoute or VPN if specified
-    if inputs.network_services and any(svc in ["expressroute", "vpn_gateway"] for svc in inputs.network_services):
+    if inputs.network_services and not HYBRID_GATEWAY_SERVICES.isdisjoint(inputs.network_services):
         if "expressroute" in inputs.network_services:
             lines.append("            ER[\"⚡ ExpressRoute<br/>Private Connection\"]")
         if "vpn_gateway" in inputs.network_services:
@@ -1727,11 +1735,8 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     
     # Add network security services in hub
     if inputs.security_services:
-        for service in inputs.security_services:
-            if service in AZURE_SERVICES_MAPPING and service in ["security_center", "sentinel", "defender"]:
-                service_info = AZURE_SERVICES_MAPPING[service]
-                service_id = service.upper().replace("_", "")
-                lines.append(f"                {service_id}[\"{service_info['icon']} {service_info['name']}<br/>Security Monitoring\"]")
+        security_monitors = [service for service in inputs.security_services if service in SECURITY_MONITOR_SERVICES]
+        lines.extend(_mermaid_service_nodes(security_monitors, "Security Monitoring"))
     
     lines.extend([
         "            end",
@@ -1744,11 +1749,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     
     # Add monitoring services in hub
     if inputs.monitoring_services:
-        for service in inputs.monitoring_services:
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
-                service_id = service.upper().replace("_", "")
-                lines.append(f"                {service_id}[\"{service_info['icon']} {service_info['name']}<br/>Centralized Monitoring\"]")
+        lines.extend(_mermaid_service_nodes(inputs.monitoring_services, "Centralized Monitoring"))
     
     lines.extend([
         "            end",
@@ -1759,11 +1760,8 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     
     # Add gateways based on network services
     if inputs.network_services:
-        for service in inputs.network_services:
-            if service in ["application_gateway", "load_balancer", "vpn_gateway"]:
-                service_info = AZURE_SERVICES_MAPPING[service]
-                service_id = service.upper().replace("_", "")
-                lines.append(f"                {service_id}[\"{service_info['icon']} {service_info['name']}<br/>Traffic Management\"]")
+        gateways = [service for service in inputs.network_services if service in GATEWAY_SERVICES]
+        lines.extend(_mermaid_service_nodes(gateways, "Traffic Management"))
     
     lines.extend([
         "            end",
@@ -1780,11 +1778,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     
     # Add compute services in production spoke
     if inputs.compute_services:
-        for service in inputs.compute_services:
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
-                service_id = f"PROD_{service.upper().replace('_', '')}"
-                lines.append(f"                {service_id}[\"{service_info['icon']} {service_info['name']}<br/>Production\"]")
+        lines.extend(_mermaid_service_nodes(inputs.compute_services, "Production", id_prefix="PROD_"))
     
     # Add database services in production spoke
     if inputs.database_services:
@@ -1792,11 +1786,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
         lines.append("")
         lines.append("            %% Production Data Services")
         lines.append("            subgraph \"ProdData\" [\"🗄️ Data Services\"]")
-        for service in inputs.database_services:
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
-                service_id = f"PROD_{service.upper().replace('_', '')}"
-                lines.append(f"                {service_id}[\"{service_info['icon']} {service_info['name']}<br/>Production Data\"]")
+        lines.extend(_mermaid_service_nodes(inputs.database_services, "Production Data", id_prefix="PROD_"))
     
     lines.extend([
         "            end",
@@ -1815,8 +1805,8 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     if inputs.compute_services:
         # Just show primary compute service for dev to avoid clutter
         primary_compute = inputs.compute_services[0] if inputs.compute_services else "app_services"
-        if primary_compute in AZURE_SERVICES_MAPPING:
-            service_info = AZURE_SERVICES_MAPPING[primary_compute]
+        service_info = AZURE_SERVICES_MAPPING.get(primary_compute)
+        if service_info:
             lines.append(f"                DEV_COMPUTE[\"{service_info['icon']} Dev/Test<br/>{service_info['name']}\"]")
     
     lines.extend([
@@ -1846,7 +1836,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     ])
     
     # Add specific gateway connections
-    if inputs.network_services:
+    if inputs.network_services and not HYBRID_GATEWAY_SERVICES.isdisjoint(inputs.network_services):
         if "expressroute" in inputs.network_services:
             lines.append("        ER -.->|\"Private Peering\"| FIREWALL")
         if "vpn_gateway" in inputs.network_services:
@@ -1873,23 +1863,25 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     ])
     
     # Add security monitoring connections if services exist
+    # (edge suffix per spoke VNet is formatted once, not per service)
     if inputs.security_services:
-        for service in inputs.security_services:
-            if service in ["security_center", "sentinel", "defender"]:
-                service_id = service.upper().replace("_", "")
-                lines.extend([
-                    f"        {service_id} -.->|\"Monitor\"| PRODVNET",
-                    f"        {service_id} -.->|\"Monitor\"| DEVVNET"
-                ])
+        monitor_suffixes = [f" -.->|\"Monitor\"| {vnet_id}" for vnet_id in SPOKE_VNET_IDS]
+        security_monitor_ids = [_mermaid_id(service) for service in inputs.security_services
+                                if service in SECURITY_MONITOR_SERVICES]
+        lines.extend(
+            f"        {service_id}{suffix}"
+            for service_id, suffix in product(security_monitor_ids, monitor_suffixes)
+        )
     
     # Add monitoring connections if services exist
+    # (every monitor links to every spoke VNet: resolve the ids once, then emit the pairs in one pass)
     if inputs.monitoring_services:
-        for service in inputs.monitoring_services:
-            service_id = service.upper().replace("_", "")
-            lines.extend([
-                f"        {service_id} -.->|\"Telemetry\"| PRODVNET",
-                f"        {service_id} -.->|\"Telemetry\"| DEVVNET"
-            ])
+        telemetry_suffixes = [f" -.->|\"Telemetry\"| {vnet_id}" for vnet_id in SPOKE_VNET_IDS]
+        monitor_ids = [_mermaid_id(service) for service in inputs.monitoring_services]
+        lines.extend(
+            f"        {service_id}{suffix}"
+            for service_id, suffix in product(monitor_ids, telemetry_suffixes)
+        )
     
     # Enhanced service-to-service connectivity
     lines.append("        %% Enhanced Service-to-Service Connectivity")
@@ -1897,26 +1889,10 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     # Database connectivity patterns
     if inputs.database_services:
         for db_service in inputs.database_services:
+            lines.extend(MERMAID_DATABASE_LINKS.get(db_service, ()))
+            # Connect SQL to compute services if they exist
             if db_service == "sql_database":
-                lines.extend([
-                    "        %% SQL Database Connections",
-                    "        FIREWALL -->|\"Database Security\"| PROD_SQLDATABASE",
-                    "        KEYVAULT -.->|\"Connection Strings\"| PROD_SQLDATABASE",
-                    "        AAD -.->|\"Database Authentication\"| PROD_SQLDATABASE"
-                ])
-                # Connect to compute services if they exist
-                if inputs.compute_services:
-                    for compute in inputs.compute_services:
-                        if compute == "virtual_machines":
-                            lines.append("        PROD_VIRTUALMACHINES -->|\"Application Data\"| PROD_SQLDATABASE")
-                        elif compute == "app_services":
-                            lines.append("        PROD_APPSERVICES -->|\"Application Data\"| PROD_SQLDATABASE")
-            elif db_service == "cosmos_db":
-                lines.extend([
-                    "        %% Cosmos DB Connections", 
-                    "        FIREWALL -->|\"NoSQL Security\"| PROD_COSMOSDB",
-                    "        AAD -.->|\"Cosmos Authentication\"| PROD_COSMOSDB"
-                ])
+                lines.extend(_compute_links(inputs.compute_services, SQL_COMPUTE_LINKS))
     
     # Storage service connections
     if inputs.storage_services:
@@ -1926,12 +1902,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
             "        AAD -.->|\"Storage Access Control\"| PROD_STORAGEACCOUNTS"
         ])
         # Connect to compute services
-        if inputs.compute_services:
-            for compute in inputs.compute_services:
-                if compute == "virtual_machines":
-                    lines.append("        PROD_VIRTUALMACHINES -->|\"Data Storage\"| PROD_STORAGEACCOUNTS")
-                elif compute == "app_services":
-                    lines.append("        PROD_APPSERVICES -->|\"App Data\"| PROD_STORAGEACCOUNTS")
+        lines.extend(_compute_links(inputs.compute_services, STORAGE_COMPUTE_LINKS))
     
     # Analytics service connections (data flow patterns)
     if inputs.analytics_services:
@@ -1961,14 +1932,7 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
         ])
         
         # Connect DevOps to compute services
-        if inputs.compute_services:
-            for compute in inputs.compute_services:
-                if compute == "virtual_machines":
-                    lines.append("        DEVOPS -->|\"VM Deployment\"| PROD_VIRTUALMACHINES")
-                elif compute == "app_services":
-                    lines.append("        DEVOPS -->|\"App Deployment\"| PROD_APPSERVICES")
-                elif compute == "aks":
-                    lines.append("        DEVOPS -->|\"Container Deployment\"| PROD_AKS")
+        lines.extend(_compute_links(inputs.compute_services, DEVOPS_COMPUTE_LINKS))
     
     # Integration service connections
     if inputs.integration_services:
@@ -2008,23 +1972,21 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     # Apply workload styles - include new services with correct naming
     workload_services = ["PROD_VIRTUALMACHINES", "DEV_COMPUTE", "PROD_APPSERVICES", "PROD_AKS", "PROD_SQLDATABASE", "PROD_COSMOSDB", "PROD_STORAGEACCOUNTS", "ANALYTICS", "DEVOPS", "INTEGRATION"]
     
-    # Only include services that actually exist in the diagram
-    existing_workload_services = []
-    for service_id in workload_services:
-        if any(service_id in line for line in lines):
-            existing_workload_services.append(service_id)
+    # Only include services that actually exist in the diagram; one snapshot serves every
+    # presence check below, since the class lines appended here only repeat ids already drawn
+    diagram_text = "\n".join(lines)
+    existing_workload_services = [
+        service_id for service_id in workload_services if service_id in diagram_text
+    ]
     
     if existing_workload_services:
         lines.append(f"    class {','.join(existing_workload_services)} workloadStyle;")
     if inputs.compute_services or inputs.database_services:
-        workload_ids = []
-        if inputs.compute_services:
-            for service in inputs.compute_services:
-                workload_ids.append(f"PROD_{service.upper().replace('_', '')}")
-        if inputs.database_services:
-            for service in inputs.database_services:
-                workload_ids.append(f"PROD_{service.upper().replace('_', '')}")
-        if "DEV_COMPUTE" in "\n".join(lines):
+        workload_ids = [
+            f"PROD_{_mermaid_id(service)}"
+            for service in (inputs.compute_services or []) + (inputs.database_services or [])
+        ]
+        if "DEV_COMPUTE" in diagram_text:
             workload_ids.append("DEV_COMPUTE")
         
         if workload_ids:
@@ -2032,25 +1994,19 @@ def generate_professional_mermaid(inputs: CustomerInputs) -> str:
     
     # Apply security and monitoring styles
     if inputs.security_services:
-        security_ids = []
-        for service in inputs.security_services:
-            if service in ["security_center", "sentinel", "defender"]:
-                security_ids.append(service.upper().replace("_", ""))
+        security_ids = [_mermaid_id(service) for service in inputs.security_services
+                        if service in SECURITY_MONITOR_SERVICES]
         if security_ids:
             lines.append(f"    class {','.join(security_ids)} securityStyle;")
     
     if inputs.monitoring_services:
-        monitoring_ids = []
-        for service in inputs.monitoring_services:
-            monitoring_ids.append(service.upper().replace("_", ""))
+        monitoring_ids = [_mermaid_id(service) for service in inputs.monitoring_services]
         if monitoring_ids:
             lines.append(f"    class {','.join(monitoring_ids)} networkStyle;")
     
     if inputs.network_services:
-        gateway_ids = []
-        for service in inputs.network_services:
-            if service in ["application_gateway", "load_balancer", "vpn_gateway"]:
-                gateway_ids.append(service.upper().replace("_", ""))
+        gateway_ids = [_mermaid_id(service) for service in inputs.network_services
+                       if service in GATEWAY_SERVICES]
         if gateway_ids:
             lines.append(f"    class {','.join(gateway_ids)} networkStyle;")
     
@@ -2066,6 +2022,67 @@ def generate_professional_mermaid_with_orchestration(inputs: CustomerInputs, orc
         # Fallback to traditional generation
         return generate_professional_mermaid(inputs)
 
+# On-premises connectivity paths for orchestrated Mermaid diagrams, in priority order:
+# (hub service, Mermaid edge lines). The fallback routes through the hub firewall.
+HYBRID_CONNECTIVITY_PATHS = (
+    ("vpn_gateway", (
+        "    ONPREM -.->|\"Site-to-Site VPN\"| VPN",
+        "    VPN -->|\"Secure Tunnel\"| HUBVNET",
+    )),
+    ("expressroute", (
+        "    ONPREM -.->|\"Private Peering\"| ER",
+        "    ER -->|\"Dedicated Connection\"| HUBVNET",
+    )),
+)
+HYBRID_CONNECTIVITY_FALLBACK = ("    ONPREM -.->|\"Hybrid Connection\"| FIREWALL",)
+
+# Optional hub service -> Mermaid node drawn in the orchestrated hub (built once, read-only)
+ORCHESTRATED_HUB_NODES = MappingProxyType({
+    'azure_ad': "AD[\"👥 Azure AD<br/>Identity Provider\"]",
+    'security_center': "SC[\"🛡️ Security Center<br/>Threat Protection\"]",
+    'log_analytics': "LA[\"📊 Log Analytics<br/>Monitoring Hub\"]",
+    'vpn_gateway': "VPN[\"🌐 VPN Gateway<br/>Hybrid Connectivity\"]",
+    'expressroute': "ER[\"⚡ ExpressRoute<br/>Private Connection\"]"
+})
+
+# Production spoke tiers in drawing order, each with the services it draws as Mermaid nodes
+ORCHESTRATED_PROD_WORKLOAD_NODES = (
+    ("web_tier", MappingProxyType({
+        "app_services": "            PRODAPP[\"🌐 App Services<br/>Production Web Apps\"]",
+    })),
+    ("application_tier", MappingProxyType({
+        "virtual_machines": "            PRODVM[\"💻 Virtual Machines<br/>Production Compute\"]",
+        "aks": "            PRODAKS[\"☸️ AKS Cluster<br/>Production Containers\"]",
+    })),
+    ("data_tier", MappingProxyType({
+        "sql_database": "            PRODDB[\"🗄️ SQL Database<br/>Production Data\"]",
+        "cosmos_db": "            PRODCOSMOS[\"🌍 Cosmos DB<br/>Global Database\"]",
+    })),
+)
+
+# Mermaid node id -> monitoring edge label, used when the node is present in the diagram
+ORCHESTRATED_SERVICE_MONITORS = MappingProxyType({
+    "PRODAPP": "App Insights",
+    "PRODVM": "VM Metrics",
+    "PRODDB": "DB Performance",
+    "FIREWALL": "Security Logs"
+})
+
+# Database service -> Mermaid connectivity lines drawn once per selected database
+ORCHESTRATED_DATABASE_LINKS = MappingProxyType({
+    "sql_database": (
+        "    %% Database Connectivity",
+        "    FIREWALL -->|\"Database Security\"| PRODDB",
+        "    PRODAPP -->|\"Application Data\"| PRODDB",
+        "    PRODVM -->|\"Database Access\"| PRODDB",
+    ),
+    "cosmos_db": (
+        "    %% Cosmos DB Connectivity",
+        "    FIREWALL -->|\"NoSQL Security\"| PRODCOSMOS",
+        "    PRODAPP -->|\"Document Data\"| PRODCOSMOS",
+    ),
+})
+
 def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result: Dict[str, Any]) -> str:
     """Generate Mermaid diagram using orchestration results with clear hub-spoke separation"""
     
@@ -2103,17 +2120,10 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
     ])
     
     # Add additional hub services based on orchestration
-    hub_service_mapping = {
-        'azure_ad': "AD[\"👥 Azure AD<br/>Identity Provider\"]",
-        'security_center': "SC[\"🛡️ Security Center<br/>Threat Protection\"]",
-        'log_analytics': "LA[\"📊 Log Analytics<br/>Monitoring Hub\"]",
-        'vpn_gateway': "VPN[\"🌐 VPN Gateway<br/>Hybrid Connectivity\"]",
-        'expressroute': "ER[\"⚡ ExpressRoute<br/>Private Connection\"]"
-    }
-    
-    for service in hub_services:
-        if service in hub_service_mapping:
-            lines.append(f"        {hub_service_mapping[service]}")
+    lines.extend(
+        f"        {hub_node}"
+        for service in hub_services if (hub_node := ORCHESTRATED_HUB_NODES.get(service))
+    )
     
     lines.extend([
         "    end",
@@ -2135,27 +2145,13 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
         
         lines.append("        subgraph \"ProdWorkloads\" [\"💼 Production Workloads\"]")
         
-        # Web tier
-        if prod_services.get("web_tier"):
-            for service in prod_services["web_tier"]:
-                if service == "app_services":
-                    lines.append("            PRODAPP[\"🌐 App Services<br/>Production Web Apps\"]")
-        
-        # Application tier  
-        if prod_services.get("application_tier"):
-            for service in prod_services["application_tier"]:
-                if service == "virtual_machines":
-                    lines.append("            PRODVM[\"💻 Virtual Machines<br/>Production Compute\"]")
-                elif service == "aks":
-                    lines.append("            PRODAKS[\"☸️ AKS Cluster<br/>Production Containers\"]")
-        
-        # Data tier
-        if prod_services.get("data_tier"):
-            for service in prod_services["data_tier"]:
-                if service == "sql_database":
-                    lines.append("            PRODDB[\"🗄️ SQL Database<br/>Production Data\"]")
-                elif service == "cosmos_db":
-                    lines.append("            PRODCOSMOS[\"🌍 Cosmos DB<br/>Global Database\"]")
+        # Web, application and data tiers in one pass over the tier table
+        lines.extend(
+            node
+            for tier, tier_nodes in ORCHESTRATED_PROD_WORKLOAD_NODES
+            for service in prod_services.get(tier) or ()
+            if (node := tier_nodes.get(service))
+        )
         
         lines.extend([
             "        end",
@@ -2214,15 +2210,12 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
         "    BASTION -.->|\"Secure Admin Access\"| DEVVNET"
     ])
     
-    # External connectivity based on orchestration
-    if "vpn_gateway" in hub_services:
-        lines.append("    ONPREM -.->|\"Site-to-Site VPN\"| VPN")
-        lines.append("    VPN -->|\"Secure Tunnel\"| HUBVNET")
-    elif "expressroute" in hub_services:
-        lines.append("    ONPREM -.->|\"Private Peering\"| ER")
-        lines.append("    ER -->|\"Dedicated Connection\"| HUBVNET")
-    else:
-        lines.append("    ONPREM -.->|\"Hybrid Connection\"| FIREWALL")
+    # External connectivity based on orchestration: first matching hybrid path wins
+    hybrid_links = next(
+        (links for service, links in HYBRID_CONNECTIVITY_PATHS if service in hub_services),
+        HYBRID_CONNECTIVITY_FALLBACK
+    )
+    lines.extend(hybrid_links)
     
     lines.extend([
         "    INTERNET -->|\"Public Traffic\"| FIREWALL",
@@ -2253,19 +2246,7 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
     # Database and storage connectivity patterns
     if inputs.database_services:
         for db_service in inputs.database_services:
-            if db_service == "sql_database":
-                lines.extend([
-                    "    %% Database Connectivity",
-                    "    FIREWALL -->|\"Database Security\"| PRODDB",
-                    "    PRODAPP -->|\"Application Data\"| PRODDB",
-                    "    PRODVM -->|\"Database Access\"| PRODDB"
-                ])
-            elif db_service == "cosmos_db":
-                lines.extend([
-                    "    %% Cosmos DB Connectivity", 
-                    "    FIREWALL -->|\"NoSQL Security\"| PRODCOSMOS",
-                    "    PRODAPP -->|\"Document Data\"| PRODCOSMOS"
-                ])
+            lines.extend(ORCHESTRATED_DATABASE_LINKS.get(db_service, ()))
     
     # Storage service connections
     if inputs.storage_services:
@@ -2287,16 +2268,11 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
         ])
         
         # Monitor specific services if they exist
-        service_monitors = {
-            "PRODAPP": "App Insights",
-            "PRODVM": "VM Metrics", 
-            "PRODDB": "DB Performance",
-            "FIREWALL": "Security Logs"
-        }
-        
-        for service_id, monitor_type in service_monitors.items():
-            # Check if service exists in the diagram by looking for it in lines
-            if any(service_id in line for line in lines):
+        # Check which services exist in the diagram against a single snapshot of the
+        # lines instead of rescanning every line for each monitored service
+        diagram_text = "\n".join(lines)
+        for service_id, monitor_type in ORCHESTRATED_SERVICE_MONITORS.items():
+            if service_id in diagram_text:
                 lines.append(f"    MONITOR -.->|\"{monitor_type}\"| {service_id}")
     
     # Analytics and AI service connections (data flow patterns)
@@ -2331,29 +2307,34 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
         "    class PRODVNET,DEVVNET spokeStyle"
     ])
     
+    # Snapshot the diagram once so each styled id is one substring check rather than
+    # a scan over every line; the class lines appended below only repeat ids already present
+    diagram_text = "\n".join(lines)
+    
     # Add styling for hub services including new services
     hub_service_ids = ["AD", "SC", "LA", "VPN", "ER", "KEYVAULT", "MONITOR"]
-    existing_hub_ids = [id for id in hub_service_ids if any(id in line for line in lines)]
+    existing_hub_ids = [id for id in hub_service_ids if id in diagram_text]
     if existing_hub_ids:
         lines.append(f"    class {','.join(existing_hub_ids)} sharedStyle")
     
     # Add styling for workload and analytics components
-    workload_ids = []
+    workload_markers = ["PRODAPP", "PRODVM", "PRODAKS", "PRODDB", "PRODCOSMOS", "PRODSTORAGE", "DEVAPP", "DEVVM", "DEVDB"]
     analytics_ids = ["ANALYTICS", "DEVOPS"]
     
-    for line in lines:
-        # Extract workload IDs
-        if any(wl in line for wl in ["PRODAPP", "PRODVM", "PRODAKS", "PRODDB", "PRODCOSMOS", "PRODSTORAGE", "DEVAPP", "DEVVM", "DEVDB"]):
-            if "[" in line:
-                id_part = line.split("[")[0].strip()
-                if id_part and id_part not in workload_ids:
-                    workload_ids.append(id_part)
+    # Extract workload IDs from their node lines; dict.fromkeys drops repeats in one
+    # pass while keeping first-seen order, instead of a membership scan per line
+    declared_ids = (
+        line.split("[")[0].strip()
+        for line in lines
+        if "[" in line and any(wl in line for wl in workload_markers)
+    )
+    workload_ids = list(dict.fromkeys(id_part for id_part in declared_ids if id_part))
     
     if workload_ids:
         lines.append(f"    class {','.join(workload_ids)} workloadStyle")
     
     # Add styling for analytics services
-    existing_analytics_ids = [id for id in analytics_ids if any(id in line for line in lines)]
+    existing_analytics_ids = [id for id in analytics_ids if id in diagram_text]
     if existing_analytics_ids:
         lines.append(f"    class {','.join(existing_analytics_ids)} sharedStyle")
     
@@ -2369,6 +2350,12 @@ def _generate_orchestrated_mermaid(inputs: CustomerInputs, orchestration_result:
     return "\n".join(lines)
 
 
+# Fill/stroke/font colours shared by every Azure service cell in the draw.io export
+DRAWIO_SERVICE_COLORS = "fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;"
+
+# Security services the draw.io export always draws, so selections of them are not repeated
+DRAWIO_CORE_SECURITY_SERVICES = frozenset({'active_directory', 'key_vault', 'security_center'})
+
 def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
     """Generate enhanced Draw.io XML with comprehensive Azure stencils based on user selections"""
     
@@ -2384,6 +2371,8 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
     section_height = 350
     service_width = 100
     service_height = 80
+    # Every service cell shares this geometry size, so format it once rather than per cell
+    service_size = f'width="{service_width}" height="{service_height}"'
     
     # Build dynamic XML content
     xml_parts = [
@@ -2413,14 +2402,14 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
           <mxGeometry x="{mg_x}" y="{mg_y}" width="80" height="60" as="geometry" />
         </mxCell>""")
     
-    mg_x += 120
-    for i, mg in enumerate(template['template']['management_groups'][1:3]):  # Platform and Workloads
-        mg_id = mg.lower().replace(' ', '-')
+    # Platform and Workloads sit in the next two slots to the right of the root group
+    platform_groups = islice(template['template']['management_groups'], 1, 3)
+    for group_x, mg in zip((mg_x + 120, mg_x + 240), platform_groups):
+        mg_id = _template_slug(mg)
         xml_parts.append(f"""
         <mxCell id="{mg_id}-mg" value="{mg}" style="shape=mxgraph.azure.management;fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{mg_x}" y="{mg_y}" width="80" height="60" as="geometry" />
+          <mxGeometry x="{group_x}" y="{mg_y}" width="80" height="60" as="geometry" />
         </mxCell>""")
-        mg_x += 120
     
     # Subscriptions
     current_y += 300
@@ -2434,8 +2423,8 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
     sub_y = current_y + 50
     for sub in template['template']['subscriptions'][:4]:  # First 4 subscriptions
         xml_parts.append(f"""
-        <mxCell id="{sub.lower().replace(' ', '-')}-sub" value="{sub}" style="shape=mxgraph.azure.subscription;fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{sub_x}" y="{sub_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="{_template_slug(sub)}-sub" value="{sub}" style="shape=mxgraph.azure.subscription;fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
+          <mxGeometry x="{sub_x}" y="{sub_y}" {service_size} as="geometry" />
         </mxCell>""")
         sub_x += 130
         if sub_x > 1200:  # Wrap to next row
@@ -2474,12 +2463,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         net_x = 600
         net_y = hub_y
         for i, service in enumerate(inputs.network_services[:4]):  # Max 4 network services
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="net-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{net_x}" y="{net_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="net-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{net_x}" y="{net_y}" {service_size} as="geometry" />
         </mxCell>""")
                 net_y += 100
     
@@ -2495,18 +2484,18 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         comp_x = 1050
         comp_y = current_y + 50
         
-        # Add selected compute services
-        services_to_add = inputs.compute_services or []
+        # Add selected compute services (copied so the workload is not appended to the caller's inputs)
+        services_to_add = list(inputs.compute_services or [])
         if inputs.workload and inputs.workload not in services_to_add:
             services_to_add.append(inputs.workload)
             
         for i, service in enumerate(services_to_add[:6]):  # Max 6 compute services
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="compute-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{comp_x}" y="{comp_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="compute-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{comp_x}" y="{comp_y}" {service_size} as="geometry" />
         </mxCell>""")
                 comp_x += 120
                 if comp_x > 1450:  # Wrap to next row
@@ -2525,12 +2514,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         stor_x = 150
         stor_y = current_y + 50
         for i, service in enumerate(inputs.storage_services[:4]):
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'storage_accounts')
                 xml_parts.append(f"""
-        <mxCell id="storage-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{stor_x}" y="{stor_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="storage-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{stor_x}" y="{stor_y}" {service_size} as="geometry" />
         </mxCell>""")
                 stor_x += 120
                 if stor_x > 550:
@@ -2555,19 +2544,21 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         </mxCell>""")
             db_y = current_y
         
-        db_x = 850 if inputs.storage_services else 150
+        # Row start and wrap point depend only on whether storage shares the row
+        db_row_x, db_wrap_x = (850, 1250) if inputs.storage_services else (150, 550)
+        db_x = db_row_x
         db_y += 50
         for i, service in enumerate(inputs.database_services[:4]):
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'sql_database')
                 xml_parts.append(f"""
-        <mxCell id="database-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{db_x}" y="{db_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="database-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{db_x}" y="{db_y}" {service_size} as="geometry" />
         </mxCell>""")
                 db_x += 120
-                if db_x > (1250 if inputs.storage_services else 550):
-                    db_x = 850 if inputs.storage_services else 150
+                if db_x > db_wrap_x:
+                    db_x = db_row_x
                     db_y += 100
     
     # Security Services Section (always present)
@@ -2589,8 +2580,8 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
     
     for sec_id, sec_name, sec_shape in core_security:
         xml_parts.append(f"""
-        <mxCell id="{sec_id}" value="{sec_name}" style="shape=mxgraph.azure.{sec_shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{sec_x}" y="{sec_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="{sec_id}" value="{sec_name}" style="shape=mxgraph.azure.{sec_shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{sec_x}" y="{sec_y}" {service_size} as="geometry" />
         </mxCell>""")
         sec_x += 120
         if sec_x > 2100:
@@ -2600,12 +2591,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
     # Add additional selected security services
     if inputs.security_services:
         for i, service in enumerate(inputs.security_services):
-            if service in AZURE_SERVICES_MAPPING and service not in ['active_directory', 'key_vault', 'security_center']:
+            if service in AZURE_SERVICES_MAPPING and service not in DRAWIO_CORE_SECURITY_SERVICES:
                 service_info = AZURE_SERVICES_MAPPING[service]
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="security-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{sec_x}" y="{sec_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="security-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{sec_x}" y="{sec_y}" {service_size} as="geometry" />
         </mxCell>""")
                 sec_x += 120
                 if sec_x > 2100:
@@ -2624,12 +2615,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         ana_x = 1750
         ana_y = analytics_y + 50
         for i, service in enumerate(inputs.analytics_services[:4]):
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="analytics-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{ana_x}" y="{ana_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="analytics-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{ana_x}" y="{ana_y}" {service_size} as="geometry" />
         </mxCell>""")
                 ana_x += 120
                 if ana_x > 2100:
@@ -2648,12 +2639,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         int_x = 150
         int_y += 50
         for i, service in enumerate(inputs.integration_services[:4]):
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="integration-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{int_x}" y="{int_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="integration-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{int_x}" y="{int_y}" {service_size} as="geometry" />
         </mxCell>""")
                 int_x += 120
                 if int_x > 550:
@@ -2673,12 +2664,12 @@ def generate_enhanced_drawio_xml(inputs: CustomerInputs) -> str:
         dev_x = devops_x_offset + 50
         dev_y = devops_y + 50
         for i, service in enumerate(inputs.devops_services[:3]):
-            if service in AZURE_SERVICES_MAPPING:
-                service_info = AZURE_SERVICES_MAPPING[service]
+            service_info = AZURE_SERVICES_MAPPING.get(service)
+            if service_info:
                 shape = service_info.get('drawio_shape', 'generic_service')
                 xml_parts.append(f"""
-        <mxCell id="devops-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};fillColor=#0078d4;strokeColor=#005a9e;fontColor=#ffffff;" vertex="1" parent="1">
-          <mxGeometry x="{dev_x}" y="{dev_y}" width="{service_width}" height="{service_height}" as="geometry" />
+        <mxCell id="devops-service-{i}" value="{esc(service_info['name'])}" style="shape=mxgraph.azure.{shape};{DRAWIO_SERVICE_COLORS}" vertex="1" parent="1">
+          <mxGeometry x="{dev_x}" y="{dev_y}" {service_size} as="geometry" />
         </mxCell>""")
                 dev_x += 120
                 if dev_x > (devops_x_offset + 250):
@@ -2835,11 +2826,13 @@ The proposed Azure Landing Zone follows the {template['template']['name']} patte
 #### Management Groups
 """
     
-    for i, mg in enumerate(template['template']['management_groups']):
+    # Pair each management group with its parent (the previous group, or the tenant root)
+    management_groups = template['template']['management_groups']
+    for parent, mg in zip(['Tenant Root'] + management_groups, management_groups):
         lld += f"""
 **{mg} Management Group:**
-- Management Group ID: mg-{mg.lower().replace(' ', '-')}
-- Parent: {template['template']['management_groups'][i-1] if i > 0 else 'Tenant Root'}
+- Management Group ID: mg-{_template_slug(mg)}
+- Parent: {parent}
 - Applied Policies: Azure Policy assignments for {mg.lower()}
 """
 
@@ -2850,7 +2843,7 @@ The proposed Azure Landing Zone follows the {template['template']['name']} patte
     for sub in template['template']['subscriptions']:
         lld += f"""
 **{sub} Subscription:**
-- Subscription Name: sub-{sub.lower().replace(' ', '-')}
+- Subscription Name: sub-{_template_slug(sub)}
 - Resource Groups: Multiple RGs based on workload segregation
 - RBAC: Custom roles and assignments
 - Budget: Cost management and alerting configured
@@ -3179,16 +3172,14 @@ def _generate_orchestrated_drawio(inputs: CustomerInputs, orchestration_result:
         </mxCell>''')
     
     # Hub services based on orchestration
+    # (cells step 40px right and down per service, so positions come from the index)
     hub_services = hub_data.get("services", [])
-    service_y = 40
-    for i, service in enumerate(hub_services[:3]):  # Limit to 3 for layout
-        service_x = 160 + (i * 40)
-        service_name = service.replace('_', ' ').title()
-        xml_parts.append(f'''
-        <mxCell id="hub-{service}" value="{service_name}" style="shape=mxgraph.azure.azure_service;fillColor=#40e0d0;strokeColor=#008b8b;" vertex="1" parent="hub-container">
-          <mxGeometry x="{service_x}" y="{service_y}" width="30" height="30" as="geometry" />
-        </mxCell>''')
-        service_y += 40
+    xml_parts.extend(f'''
+        <mxCell id="hub-{service}" value="{_service_display_name(service)}" style="shape=mxgraph.azure.azure_service;fillColor=#40e0d0;strokeColor=#008b8b;" vertex="1" parent="hub-container">
+          <mxGeometry x="{160 + offset}" y="{40 + offset}" width="30" height="30" as="geometry" />
+        </mxCell>'''
+        for offset, service in zip(range(0, 120, 40), hub_services)  # Limit to 3 for layout
+    )
     
     # Production Spoke
     prod_x, prod_y = 600, 50
@@ -3205,15 +3196,12 @@ def _generate_orchestrated_drawio(inputs: CustomerInputs, orchestration_result:
     
     # Production workloads based on orchestration
     spoke_services = spokes_data.get("services", [])
-    workload_y = 40
-    for i, service in enumerate(spoke_services[:3]):  # Limit for layout
-        workload_x = 160 + (i * 40)
-        service_name = service.replace('_', ' ').title()
-        xml_parts.append(f'''
-        <mxCell id="prod-{service}" value="{service_name}" style="shape=mxgraph.azure.azure_service;fillColor=#98fb98;strokeColor=#006400;" vertex="1" parent="prod-spoke-container">
-          <mxGeometry x="{workload_x}" y="{workload_y}" width="30" height="30" as="geometry" />
-        </mxCell>''')
-        workload_y += 40
+    xml_parts.extend(f'''
+        <mxCell id="prod-{service}" value="{_service_display_name(service)}" style="shape=mxgraph.azure.azure_service;fillColor=#98fb98;strokeColor=#006400;" vertex="1" parent="prod-spoke-container">
+          <mxGeometry x="{160 + offset}" y="{40 + offset}" width="30" height="30" as="geometry" />
+        </mxCell>'''
+        for offset, service in zip(range(0, 120, 40), spoke_services)  # Limit to 3 for layout
+    )
     
     # Development Spoke
     dev_x, dev_y = 600, 300
@@ -3880,10 +3868,7 @@ def generate_intelligent_diagram(request: Dict[str, str]):
                 f"{output_dir}/azure_architecture_intelligent.svg"
             ]
             
-            for path in possible_paths:
-                if os.path.exists(path):
-                    diagram_path = path
-                    break
+            diagram_path = next((path for path in possible_paths if os.path.exists(path)), None)
             
             if diagram_path:
                 # Read and encode the diagram
@@ -4115,7 +4100,7 @@ def validate_and_generate_diagram(inputs: CustomerInputs):
                     "recommendation": issue.recommendation
                 }
                 for issue in validation_result.issues
-                if issue.severity.value in ["critical", "high"]
+                if issue.severity.value in ("critical", "high")
             ][:10],  # Top 10 most important issues
             "metadata": {
                 "generated_at": datetime.now().isoformat(),
@@ -4165,11 +4150,7 @@ def get_services():
     services_by_category = {}
     
     for service_key, service_info in AZURE_SERVICES_MAPPING.items():
-        category = service_info["category"]
-        if category not in services_by_category:
-            services_by_category[category] = []
-        
-        services_by_category[category].append({
+        services_by_category.setdefault(service_info["category"], []).append({
             "key": service_key,
             "name": service_info["name"],
             "icon": service_info["icon"],
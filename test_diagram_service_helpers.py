@@ -0,0 +1,95 @@
+"""
+Test Diagram Service Helpers
+
+This test module pins down the behaviour of the service helpers in backend/main.py
+that prepare customer selections for diagram generation:
+
+1. Enterprise resource inclusion returns updated inputs without mutating the caller's lists
+2. Repeated service selections are drawn once, in first-seen order
+3. Optional service tier clusters are only opened when a selection has an icon to draw
+"""
+
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import main
+from main import CustomerInputs
+
+
+class TestDiagramServiceHelpers:
+    """Test the helpers that turn service selections into diagram content"""
+
+    def test_enterprise_resources_do_not_mutate_inputs(self):
+        """Test that auto-including enterprise resources leaves the caller's service lists unchanged"""
+        inputs = CustomerInputs(
+            business_objective="Test enterprise resource inclusion",
+            network_services=["vpn_gateway"],
+            security_services=["sentinel"],
+            enterprise_resources_mode="auto_when_missing"
+        )
+        network_services = inputs.network_services
+        security_services = inputs.security_services
+
+        result = main._ensure_enterprise_resources_included(inputs)
+
+        # Missing enterprise resources are added to the returned inputs
+        assert "firewall" in result.network_services
+        assert "key_vault" in result.security_services
+
+        # The original request object keeps its own, unmodified lists
+        assert inputs.network_services is network_services
+        assert inputs.security_services is security_services
+        assert network_services == ["vpn_gateway"]
+        assert security_services == ["sentinel"]
+
+    def test_diagram_services_deduplicates_selections(self):
+        """Test that repeated selections yield a single mapping entry and unknown keys are dropped"""
+        entries = main._diagram_services(['virtual_machines', 'virtual_machines', 'bogus'])
+
+        assert entries == [main.AZURE_SERVICES_MAPPING['virtual_machines']]
+
+    def test_diagram_services_keeps_first_seen_order(self):
+        """Test that deduplication keeps the order in which services were first selected"""
+        entries = main._diagram_services(['storage_accounts', 'virtual_machines', 'storage_accounts', 'virtual_machines'])
+
+        assert entries == [
+            main.AZURE_SERVICES_MAPPING['storage_accounts'],
+            main.AZURE_SERVICES_MAPPING['virtual_machines'],
+        ]
+
+    def test_service_clusters_skip_tiers_without_drawable_services(self, monkeypatch):
+        """Test that tier clusters whose selections have no diagram icon are not opened"""
+        opened_clusters = []
+
+        class RecordingCluster:
+            def __init__(self, label="cluster", **kwargs):
+                opened_clusters.append(label)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+        monkeypatch.setattr(main, "Cluster", RecordingCluster)
+
+        inputs = CustomerInputs(
+            business_objective="Test empty tier clusters",
+            database_services=["unknown_database"],
+            analytics_services=["unknown_analytics"],
+            integration_services=["unknown_integration"],
+            devops_services=["unknown_pipeline"]
+        )
+
+        service_collections = main._add_service_clusters(inputs, None, None)
+
+        # No empty "Databases", "Analytics & AI", "Integration" or "DevOps & Automation" boxes
+        assert opened_clusters == []
+        assert service_collections['database_services'] == []
+        assert service_collections['analytics_services'] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
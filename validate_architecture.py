@@ -16,6 +16,7 @@ Features:
 
 from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
+from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
 import json
@@ -333,6 +334,109 @@ AZ_LZ_RULES = {
     }
 }
 
+# Resource type -> diagram category used when laying out hub/spoke nodes
+RESOURCE_CATEGORY_MAP = {
+    'vm': 'compute',
+    'aks': 'compute',
+    'app_service': 'compute',
+    'virtual_network': 'networking',
+    'firewall': 'security',
+    'bastion': 'security',
+    'sql': 'database',
+    'cosmos_db': 'database',
+    'storage_account': 'storage',
+    'key_vault': 'security'
+}
+
+# Resource type aliases normalized before hub/spoke placement in generate_diagram_structure
+DIAGRAM_TYPE_ALIASES = {
+    'storage_account': 'storage',
+    'storageaccount': 'storage', 
+    'virtual_machine': 'vm',
+    'virtualmachine': 'vm',
+    'sql_database': 'sql',
+    'sqldatabase': 'sql',
+    'app_service': 'appservice',
+    'appservice': 'appservice',
+    'cosmos_db': 'cosmosdb',
+    'cosmosdb': 'cosmosdb',
+    'azure_firewall': 'firewall',
+    'azurefirewall': 'firewall',
+    'key_vault': 'keyvault',
+    'keyvault': 'keyvault',
+    'azure_kubernetes_service': 'aks',
+    'kubernetes': 'k8s',
+    'k8s': 'k8s'
+}
+
+# Normalized resource type -> placement ('hub', 'spoke' or 'keyvault'); anything else is shared
+DIAGRAM_PLACEMENT = {
+    # Hub services (shared infrastructure) - only network services, monitoring, and shared security
+    **dict.fromkeys(['firewall', 'vpn_gateway', 'expressroute', 'bastion', 'dns', 'monitor', 'log_analytics'], 'hub'),
+    # Spoke services (workload-specific) - VMs, K8s, databases, and spoke-level keyvaults
+    **dict.fromkeys(['vm', 'aks', 'app_service', 'appservice', 'sql', 'storage', 'k8s', 'kubernetes'], 'spoke'),
+    # KeyVault handling - can be in both hub and spoke depending on context
+    **dict.fromkeys(['key_vault', 'keyvault'], 'keyvault'),
+}
+
+# Severities that fail validation and drive the top recommendations
+BLOCKING_SEVERITIES = frozenset({ValidationSeverity.CRITICAL, ValidationSeverity.HIGH})
+
+# Compliance score deduction per issue, by severity
+SEVERITY_WEIGHTS = {
+    ValidationSeverity.CRITICAL: 20,
+    ValidationSeverity.HIGH: 10,
+    ValidationSeverity.MEDIUM: 5,
+    ValidationSeverity.LOW: 2,
+    ValidationSeverity.INFO: 1
+}
+
+# Security rule keys checked for "required" features -> display name used in issues
+REQUIRED_SECURITY_FEATURES = {
+    'network_security_group': 'Network Security Group',
+    'backup_enabled': 'Backup',
+    'disk_encryption': 'Disk Encryption',
+    'encryption_at_rest': 'Encryption at Rest',
+    'encryption_in_transit': 'Encryption in Transit',
+    'advanced_threat_protection': 'Advanced Threat Protection',
+    'vulnerability_assessment': 'Vulnerability Assessment',
+    'https_only': 'HTTPS Only',
+    'rbac_enabled': 'Role-Based Access Control',
+    'managed_identity': 'Managed Identity',
+    'authentication': 'Authentication'
+}
+
+# Common resource type variations (upper-cased) normalized to AZ_LZ_RULES keys
+RULE_TYPE_ALIASES = {
+    'STORAGE': 'Storage',
+    'STORAGE_ACCOUNT': 'Storage',
+    'STORAGEACCOUNT': 'Storage',
+    'FIREWALL': 'Firewall',
+    'AZURE_FIREWALL': 'Firewall',
+    'AZUREFIREWALL': 'Firewall',
+    'VIRTUAL_MACHINE': 'VM',
+    'VIRTUALMACHINE': 'VM',
+    'SQL_DATABASE': 'SQL',
+    'SQLDATABASE': 'SQL',
+    'APP_SERVICE': 'AppService',
+    'APPSERVICE': 'AppService',
+    'COSMOS_DB': 'CosmosDB',
+    'COSMOSDB': 'CosmosDB',
+    'REDIS_CACHE': 'Redis',
+    'REDISCACHE': 'Redis',
+    'KEY_VAULT': 'KeyVault',
+    'KEYVAULT': 'KeyVault'
+}
+
+def _rule_key(resource_type: str) -> str:
+    """Resolve a resource type to its AZ_LZ_RULES key"""
+    resource_type_normalized = resource_type.upper()
+    
+    # First try exact match, then try mapped version
+    if not AZ_LZ_RULES.get(resource_type_normalized) and resource_type_normalized in RULE_TYPE_ALIASES:
+        return RULE_TYPE_ALIASES[resource_type_normalized]
+    return resource_type_normalized
+
 def validate_resource(resource: Dict[str, Any], resource_type: str, architecture_context: Dict[str, Any] = None) -> List[ValidationIssue]:
     """
     Validates a single resource against its rule set and returns actionable errors.
@@ -349,36 +453,8 @@ def validate_resource(resource: Dict[str, Any], resource_type: str, architecture
     resource_name = resource.get('name', 'Unknown')
     
     # Get rules for this resource type (handle common variations)
-    resource_type_normalized = resource_type.upper()
-    
-    # Handle common resource type variations and normalize to rule keys
-    type_mappings = {
-        'STORAGE': 'Storage',
-        'STORAGE_ACCOUNT': 'Storage', 
-        'STORAGEACCOUNT': 'Storage',
-        'FIREWALL': 'Firewall',
-        'AZURE_FIREWALL': 'Firewall',
-        'AZUREFIREWALL': 'Firewall',
-        'VIRTUAL_MACHINE': 'VM',
-        'VIRTUALMACHINE': 'VM',
-        'SQL_DATABASE': 'SQL',
-        'SQLDATABASE': 'SQL',
-        'APP_SERVICE': 'AppService',
-        'APPSERVICE': 'AppService',
-        'COSMOS_DB': 'CosmosDB',
-        'COSMOSDB': 'CosmosDB',
-        'REDIS_CACHE': 'Redis',
-        'REDISCACHE': 'Redis',
-        'KEY_VAULT': 'KeyVault',
-        'KEYVAULT': 'KeyVault'
-    }
-    
-    # First try exact match, then try mapped version
+    resource_type_normalized = _rule_key(resource_type)
     rules = AZ_LZ_RULES.get(resource_type_normalized)
-    if not rules and resource_type_normalized in type_mappings:
-        mapped_type = type_mappings[resource_type_normalized]
-        rules = AZ_LZ_RULES.get(mapped_type)
-        resource_type_normalized = mapped_type
     
     if not rules:
         logger.warning(f"No validation rules defined for resource type: {resource_type} (normalized: {resource_type_normalized})")
@@ -406,6 +482,7 @@ def _validate_placement(resource: Dict[str, Any], resource_name: str, resource_t
                        placement_rules: Dict[str, Any], architecture_context: Dict[str, Any] = None) -> List[ValidationIssue]:
     """Validate resource placement requirements"""
     issues = []
+    rule_id = placement_rules.get('rule_id', 'UNKNOWN')
     
     # Check required subnet types
     if 'required_subnet' in placement_rules:
@@ -422,7 +499,7 @@ def _validate_placement(resource: Dict[str, Any], resource_name: str, resource_t
                 severity=ValidationSeverity.HIGH,
                 message=f"Resource must be placed in one of: {', '.join(required_subnets)}",
                 recommendation=f"Move {resource_name} to a private/protected subnet for security",
-                rule_id=placement_rules.get('rule_id', 'UNKNOWN'),
+                rule_id=rule_id,
                 compliance_impact="Security - Network segmentation"
             ))
     
@@ -441,7 +518,7 @@ def _validate_placement(resource: Dict[str, Any], resource_name: str, resource_t
                 severity=ValidationSeverity.CRITICAL,
                 message=f"Resource must not be in: {', '.join(avoid_subnets)} subnets",
                 recommendation=f"Move {resource_name} to a secure, private subnet",
-                rule_id=placement_rules.get('rule_id', 'UNKNOWN'),
+                rule_id=rule_id,
                 compliance_impact="Security - Public exposure risk"
             ))
     
@@ -454,7 +531,7 @@ def _validate_placement(resource: Dict[str, Any], resource_name: str, resource_t
             severity=ValidationSeverity.HIGH,
             message="Resource must be deployed within a Virtual Network",
             recommendation=f"Deploy {resource_name} in a dedicated VNet with proper network segmentation",
-            rule_id=placement_rules.get('rule_id', 'UNKNOWN'),
+            rule_id=rule_id,
             compliance_impact="Network isolation and security"
         ))
     
@@ -467,7 +544,7 @@ def _validate_placement(resource: Dict[str, Any], resource_name: str, resource_t
             severity=ValidationSeverity.MEDIUM,
             message="Resource should be configured with availability zones for high availability",
             recommendation=f"Enable availability zones for {resource_name} to ensure resilience",
-            rule_id=placement_rules.get('rule_id', 'UNKNOWN'),
+            rule_id=rule_id,
             compliance_impact="Availability and disaster recovery"
         ))
     
@@ -477,6 +554,7 @@ def _validate_security(resource: Dict[str, Any], resource_name: str, resource_ty
                       security_rules: Dict[str, Any]) -> List[ValidationIssue]:
     """Validate security requirements"""
     issues = []
+    rule_id = security_rules.get('rule_id', 'UNKNOWN')
     
     # Check forbidden configurations
     for rule_key, rule_value in security_rules.items():
@@ -489,36 +567,22 @@ def _validate_security(resource: Dict[str, Any], resource_name: str, resource_ty
                     severity=ValidationSeverity.CRITICAL,
                     message=f"{rule_key.replace('_', ' ').title()} must be disabled",
                     recommendation=f"Disable {rule_key.replace('_', ' ')} on {resource_name} for security",
-                    rule_id=security_rules.get('rule_id', 'UNKNOWN'),
+                    rule_id=rule_id,
                     compliance_impact="Security - Data exposure risk"
                 ))
     
     # Check required security features
-    required_features = {
-        'network_security_group': 'Network Security Group',
-        'backup_enabled': 'Backup',
-        'disk_encryption': 'Disk Encryption',
-        'encryption_at_rest': 'Encryption at Rest',
-        'encryption_in_transit': 'Encryption in Transit',
-        'advanced_threat_protection': 'Advanced Threat Protection',
-        'vulnerability_assessment': 'Vulnerability Assessment',
-        'https_only': 'HTTPS Only',
-        'rbac_enabled': 'Role-Based Access Control',
-        'managed_identity': 'Managed Identity',
-        'authentication': 'Authentication'
-    }
-    
     for rule_key, rule_value in security_rules.items():
-        if rule_value == "required" and rule_key in required_features:
+        if rule_value == "required" and rule_key in REQUIRED_SECURITY_FEATURES:
             if not resource.get(rule_key, False):
                 issues.append(ValidationIssue(
                     resource_name=resource_name,
                     resource_type=resource_type,
                     issue_type="security",
                     severity=ValidationSeverity.HIGH,
-                    message=f"{required_features[rule_key]} is required but not configured",
-                    recommendation=f"Enable {required_features[rule_key]} on {resource_name}",
-                    rule_id=security_rules.get('rule_id', 'UNKNOWN'),
+                    message=f"{REQUIRED_SECURITY_FEATURES[rule_key]} is required but not configured",
+                    recommendation=f"Enable {REQUIRED_SECURITY_FEATURES[rule_key]} on {resource_name}",
+                    rule_id=rule_id,
                     compliance_impact="Security - Missing protection controls"
                 ))
     
@@ -534,7 +598,7 @@ def _validate_security(resource: Dict[str, Any], resource_name: str, resource_ty
                 severity=ValidationSeverity.HIGH,
                 message=f"Minimum TLS version {required_tls} required, currently {current_tls}",
                 recommendation=f"Update TLS version to {required_tls} or higher on {resource_name}",
-                rule_id=security_rules.get('rule_id', 'UNKNOWN'),
+                rule_id=rule_id,
                 compliance_impact="Security - Encryption standards"
             ))
     
@@ -544,6 +608,7 @@ def _validate_monitoring(resource: Dict[str, Any], resource_name: str, resource_
                         monitoring_rules: Dict[str, Any]) -> List[ValidationIssue]:
     """Validate monitoring and observability requirements"""
     issues = []
+    rule_id = monitoring_rules.get('rule_id', 'UNKNOWN')
     
     required_monitoring = {
         'azure_monitor': 'Azure Monitor',
@@ -561,7 +626,7 @@ def _validate_monitoring(resource: Dict[str, Any], resource_name: str, resource_
         if rule_value == "required" and rule_key in required_monitoring:
             if not resource.get(rule_key, False):
                 severity = ValidationSeverity.MEDIUM
-                if rule_key in ['diagnostic_logs', 'auditing']:
+                if rule_key in ('diagnostic_logs', 'auditing'):
                     severity = ValidationSeverity.HIGH  # Critical for compliance
                 
                 issues.append(ValidationIssue(
@@ -571,7 +636,7 @@ def _validate_monitoring(resource: Dict[str, Any], resource_name: str, resource_
                     severity=severity,
                     message=f"{required_monitoring[rule_key]} is required but not configured",
                     recommendation=f"Enable {required_monitoring[rule_key]} on {resource_name} for observability",
-                    rule_id=monitoring_rules.get('rule_id', 'UNKNOWN'),
+                    rule_id=rule_id,
                     compliance_impact="Monitoring - Observability and audit trail"
                 ))
     
@@ -586,7 +651,7 @@ def _validate_monitoring(resource: Dict[str, Any], resource_name: str, resource_
                     severity=ValidationSeverity.LOW,
                     message=f"{required_monitoring[rule_key]} is recommended for better observability",
                     recommendation=f"Consider enabling {required_monitoring[rule_key]} on {resource_name}",
-                    rule_id=monitoring_rules.get('rule_id', 'UNKNOWN'),
+                    rule_id=rule_id,
                     compliance_impact="Monitoring - Enhanced observability"
                 ))
     
@@ -596,6 +661,7 @@ def _validate_governance(resource: Dict[str, Any], resource_name: str, resource_
                         governance_rules: Dict[str, Any]) -> List[ValidationIssue]:
     """Validate governance and compliance requirements"""
     issues = []
+    rule_id = governance_rules.get('rule_id', 'UNKNOWN')
     
     # Check required tags
     if 'tags_required' in governance_rules:
@@ -611,7 +677,7 @@ def _validate_governance(resource: Dict[str, Any], resource_name: str, resource_
                     severity=ValidationSeverity.MEDIUM,
                     message=f"Required tag '{required_tag}' is missing or empty",
                     recommendation=f"Add '{required_tag}' tag to {resource_name} for proper governance",
-                    rule_id=governance_rules.get('rule_id', 'UNKNOWN'),
+                    rule_id=rule_id,
                     compliance_impact="Governance - Resource tagging and organization"
                 ))
     
@@ -625,7 +691,7 @@ def _validate_governance(resource: Dict[str, Any], resource_name: str, resource_
                 severity=ValidationSeverity.LOW,
                 message="Resource name doesn't follow organizational naming convention",
                 recommendation=f"Rename {resource_name} to follow naming standards",
-                rule_id=governance_rules.get('rule_id', 'UNKNOWN'),
+                rule_id=rule_id,
                 compliance_impact="Governance - Naming standardization"
             ))
     
@@ -642,7 +708,7 @@ def _validate_governance(resource: Dict[str, Any], resource_name: str, resource_
                 severity=ValidationSeverity.HIGH,
                 message=f"Backup retention is {current_retention} days, minimum 30 days required",
                 recommendation=f"Set backup retention to at least 30 days for {resource_name}",
-                rule_id=governance_rules.get('rule_id', 'UNKNOWN'),
+                rule_id=rule_id,
                 compliance_impact="Data retention and compliance"
             ))
     
@@ -668,7 +734,7 @@ def validate_architecture(architecture: Dict[str, Any]) -> ValidationResult:
     if not resources:
         # Try alternative structure
         resources = []
-        for category in ['compute', 'network', 'storage', 'database', 'security']:
+        for category in ('compute', 'network', 'storage', 'database', 'security'):
             category_resources = architecture.get(category, [])
             if category_resources:
                 resources.extend(category_resources)
@@ -687,9 +753,10 @@ def validate_architecture(architecture: Dict[str, Any]) -> ValidationResult:
     # Generate summary
     summary = _generate_validation_summary(all_issues, total_resources)
     
-    # Create result
+    # Create result (the summary already counts issues per severity, so the blocking
+    # check reads those counts instead of rescanning every issue)
     result = ValidationResult(
-        passed=len([issue for issue in all_issues if issue.severity in [ValidationSeverity.CRITICAL, ValidationSeverity.HIGH]]) == 0,
+        passed=not (summary["critical_issues"] or summary["high_issues"]),
         total_resources=total_resources,
         issues_count=len(all_issues),
         issues=all_issues,
@@ -706,15 +773,7 @@ def _calculate_compliance_score(issues: List[ValidationIssue], total_resources:
         return 100.0
     
     # Weight issues by severity
-    severity_weights = {
-        ValidationSeverity.CRITICAL: 20,
-        ValidationSeverity.HIGH: 10,
-        ValidationSeverity.MEDIUM: 5,
-        ValidationSeverity.LOW: 2,
-        ValidationSeverity.INFO: 1
-    }
-    
-    total_deductions = sum(severity_weights.get(issue.severity, 1) for issue in issues)
+    total_deductions = sum(SEVERITY_WEIGHTS.get(issue.severity, 1) for issue in issues)
     max_possible_score = total_resources * 20  # Maximum deductions per resource
     
     if max_possible_score == 0:
@@ -726,25 +785,18 @@ def _calculate_compliance_score(issues: List[ValidationIssue], total_resources:
 def _generate_validation_summary(issues: List[ValidationIssue], total_resources: int) -> Dict[str, Any]:
     """Generate comprehensive validation summary"""
     # Group issues by category
-    issues_by_category = {}
-    issues_by_severity = {}
-    issues_by_type = {}
+    issues_by_category = defaultdict(list)
+    issues_by_severity = defaultdict(list)
+    issues_by_type = defaultdict(list)
     
     for issue in issues:
         # By category (resource type)
-        if issue.resource_type not in issues_by_category:
-            issues_by_category[issue.resource_type] = []
         issues_by_category[issue.resource_type].append(issue)
         
         # By severity
-        severity_str = issue.severity.value
-        if severity_str not in issues_by_severity:
-            issues_by_severity[severity_str] = []
-        issues_by_severity[severity_str].append(issue)
+        issues_by_severity[issue.severity.value].append(issue)
         
         # By issue type
-        if issue.issue_type not in issues_by_type:
-            issues_by_type[issue.issue_type] = []
         issues_by_type[issue.issue_type].append(issue)
     
     # Generate recommendations
@@ -753,27 +805,32 @@ def _generate_validation_summary(issues: List[ValidationIssue], total_resources:
     return {
         "total_resources": total_resources,
         "total_issues": len(issues),
-        "critical_issues": len([i for i in issues if i.severity == ValidationSeverity.CRITICAL]),
-        "high_issues": len([i for i in issues if i.severity == ValidationSeverity.HIGH]),
-        "medium_issues": len([i for i in issues if i.severity == ValidationSeverity.MEDIUM]),
-        "low_issues": len([i for i in issues if i.severity == ValidationSeverity.LOW]),
+        # Counts reuse the groups built above rather than rescanning the issues
+        "critical_issues": len(issues_by_severity.get(ValidationSeverity.CRITICAL.value, [])),
+        "high_issues": len(issues_by_severity.get(ValidationSeverity.HIGH.value, [])),
+        "medium_issues": len(issues_by_severity.get(ValidationSeverity.MEDIUM.value, [])),
+        "low_issues": len(issues_by_severity.get(ValidationSeverity.LOW.value, [])),
         "issues_by_category": {k: len(v) for k, v in issues_by_category.items()},
         "issues_by_type": {k: len(v) for k, v in issues_by_type.items()},
         "top_recommendations": top_recommendations,
         "validation_coverage": {
-            "placement": len([i for i in issues if i.issue_type == "placement"]),
-            "security": len([i for i in issues if i.issue_type == "security"]),
-            "monitoring": len([i for i in issues if i.issue_type == "monitoring"]),
-            "governance": len([i for i in issues if i.issue_type == "governance"])
+            "placement": len(issues_by_type.get("placement", [])),
+            "security": len(issues_by_type.get("security", [])),
+            "monitoring": len(issues_by_type.get("monitoring", [])),
+            "governance": len(issues_by_type.get("governance", []))
         }
     }
 
 def _generate_top_recommendations(issues: List[ValidationIssue]) -> List[str]:
     """Generate prioritized list of top recommendations"""
+    # Clean architectures (the common case once issues are fixed) have nothing to rank
+    if not issues:
+        return []
+    
     # Group similar recommendations
     recommendation_counts = {}
     for issue in issues:
-        if issue.severity in [ValidationSeverity.CRITICAL, ValidationSeverity.HIGH]:
+        if issue.severity in BLOCKING_SEVERITIES:
             rec = issue.recommendation
             if rec not in recommendation_counts:
                 recommendation_counts[rec] = {'count': 0, 'severity': issue.severity}
@@ -809,6 +866,9 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
     hub_resources = []
     spoke_resources = []
     shared_resources = []
+    placement_buckets = {'hub': hub_resources, 'spoke': spoke_resources, 'shared': shared_resources}
+    # Spoke resources grouped by category for VNet organization, filled while placing
+    spoke_categories = defaultdict(list)
     
     # Categorize resources based on type and configuration
     for resource in resources:
@@ -816,44 +876,26 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
         resource_name = resource.get('name', 'Unknown')
         
         # Normalize resource type for consistent processing
-        type_mappings = {
-            'storage_account': 'storage',
-            'storageaccount': 'storage', 
-            'virtual_machine': 'vm',
-            'virtualmachine': 'vm',
-            'sql_database': 'sql',
-            'sqldatabase': 'sql',
-            'app_service': 'appservice',
-            'appservice': 'appservice',
-            'cosmos_db': 'cosmosdb',
-            'cosmosdb': 'cosmosdb',
-            'azure_firewall': 'firewall',
-            'azurefirewall': 'firewall',
-            'key_vault': 'keyvault',
-            'keyvault': 'keyvault',
-            'azure_kubernetes_service': 'aks',
-            'kubernetes': 'k8s',
-            'k8s': 'k8s'
-        }
+        normalized_type = DIAGRAM_TYPE_ALIASES.get(resource_type, resource_type)
+        placement = DIAGRAM_PLACEMENT.get(normalized_type, 'shared')
         
-        normalized_type = type_mappings.get(resource_type, resource_type)
-        
-        # Hub services (shared infrastructure) - only network services, monitoring, and shared security
-        if normalized_type in ['firewall', 'vpn_gateway', 'expressroute', 'bastion', 'dns', 'monitor', 'log_analytics']:
-            hub_resources.append(resource)
-        # Spoke services (workload-specific) - VMs, K8s, databases, and spoke-level keyvaults
-        elif normalized_type in ['vm', 'aks', 'app_service', 'appservice', 'sql', 'storage', 'k8s', 'kubernetes']:
-            spoke_resources.append(resource)
-        # KeyVault handling - can be in both hub and spoke depending on context
-        elif normalized_type in ['key_vault', 'keyvault']:
+        if placement == 'keyvault':
             # Place in spoke by default (workload-specific secrets), unless specifically marked as shared
             if resource.get('scope', '').lower() == 'shared' or resource.get('name', '').lower().find('shared') != -1:
-                hub_resources.append(resource)
+                placement = 'hub'
             else:
-                spoke_resources.append(resource)
-        # Other shared services
-        else:
-            shared_resources.append(resource)
+                placement = 'spoke'
+        
+        placement_buckets[placement].append(resource)
+        if placement == 'spoke':
+            spoke_categories[_get_resource_category(resource_type)].append(resource)
+    
+    # Index validation issues by resource name once, instead of rescanning
+    # every issue for each spoke/shared resource below
+    issues_by_resource = defaultdict(list)
+    if validation_result:
+        for issue in validation_result.issues:
+            issues_by_resource[issue.resource_name].append(issue)
     
     # Create hub VNet node
     hub_node = DiagramNode(
@@ -872,9 +914,9 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
     
     # Add hub resources
     hub_y_pos = 200
-    for i, resource in enumerate(hub_resources):
-        node = DiagramNode(
-            id=f"hub-{resource.get('name', f'resource-{i}')}".lower().replace(' ', '-'),
+    hub_nodes = [
+        DiagramNode(
+            id=_node_id(f"hub-{resource.get('name', f'resource-{i}')}"),
             name=resource.get('name', f'Hub Resource {i}'),
             type=resource.get('type', 'unknown'),
             category=_get_resource_category(resource.get('type', '')),
@@ -882,19 +924,23 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
             hub_spoke_role="hub",
             position={"x": 200 + (i * 150), "y": hub_y_pos}
         )
-        nodes.append(node)
-        
-        # Connect to hub VNet
-        connections.append(DiagramConnection(
+        for i, resource in enumerate(hub_resources)
+    ]
+    nodes.extend(hub_nodes)
+    
+    # Connect to hub VNet
+    connections.extend(
+        DiagramConnection(
             source_id="hub-vnet",
             target_id=node.id,
             connection_type="contains",
             properties={"label": "hosts"}
-        ))
+        )
+        for node in hub_nodes
+    )
     
     # Create spoke VNets
     spoke_vnets = []
-    spoke_categories = _group_spoke_resources(spoke_resources)
     
     for i, (category, category_resources) in enumerate(spoke_categories.items()):
         spoke_vnet_id = f"spoke-{category}-vnet"
@@ -922,9 +968,9 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
         ))
         
         # Add resources to spoke
-        for j, resource in enumerate(category_resources):
-            resource_node = DiagramNode(
-                id=f"spoke-{category}-{resource.get('name', f'resource-{j}')}".lower().replace(' ', '-'),
+        spoke_resource_nodes = [
+            DiagramNode(
+                id=_node_id(f"spoke-{category}-{resource.get('name', f'resource-{j}')}"),
                 name=resource.get('name', f'{category.title()} Resource {j}'),
                 type=resource.get('type', 'unknown'),
                 category=_get_resource_category(resource.get('type', '')),
@@ -932,30 +978,30 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
                 hub_spoke_role="spoke",
                 position={"x": 150 + (i * 300) + (j * 100), "y": 500}
             )
-            
-            # Add validation status if available
-            if validation_result:
-                resource_issues = [issue for issue in validation_result.issues if issue.resource_name == resource.get('name')]
-                resource_node.properties['validation_status'] = {
-                    'issues_count': len(resource_issues),
-                    'has_critical': any(issue.severity == ValidationSeverity.CRITICAL for issue in resource_issues),
-                    'has_high': any(issue.severity == ValidationSeverity.HIGH for issue in resource_issues)
-                }
-            
-            nodes.append(resource_node)
-            
-            # Connect to spoke VNet
-            connections.append(DiagramConnection(
+            for j, resource in enumerate(category_resources)
+        ]
+        
+        # Add validation status if available
+        if validation_result:
+            _attach_validation_status(spoke_resource_nodes, category_resources, issues_by_resource)
+        
+        nodes += spoke_resource_nodes
+        
+        # Connect to spoke VNet
+        connections.extend(
+            DiagramConnection(
                 source_id=spoke_vnet_id,
                 target_id=resource_node.id,
                 connection_type="contains",
                 properties={"label": "hosts"}
-            ))
+            )
+            for resource_node in spoke_resource_nodes
+        )
     
     # Add shared resources
-    for i, resource in enumerate(shared_resources):
-        shared_node = DiagramNode(
-            id=f"shared-{resource.get('name', f'resource-{i}')}".lower().replace(' ', '-'),
+    shared_nodes = [
+        DiagramNode(
+            id=_node_id(f"shared-{resource.get('name', f'resource-{i}')}"),
             name=resource.get('name', f'Shared Resource {i}'),
             type=resource.get('type', 'unknown'),
             category=_get_resource_category(resource.get('type', '')),
@@ -963,17 +1009,14 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
             hub_spoke_role="shared",
             position={"x": 50 + (i * 100), "y": 600}
         )
-        
-        # Add validation status if available
-        if validation_result:
-            resource_issues = [issue for issue in validation_result.issues if issue.resource_name == resource.get('name')]
-            shared_node.properties['validation_status'] = {
-                'issues_count': len(resource_issues),
-                'has_critical': any(issue.severity == ValidationSeverity.CRITICAL for issue in resource_issues),
-                'has_high': any(issue.severity == ValidationSeverity.HIGH for issue in resource_issues)
-            }
-        
-        nodes.append(shared_node)
+        for i, resource in enumerate(shared_resources)
+    ]
+    
+    # Add validation status if available
+    if validation_result:
+        _attach_validation_status(shared_nodes, shared_resources, issues_by_resource)
+    
+    nodes += shared_nodes
     
     # Create diagram structure
     diagram = DiagramStructure(
@@ -998,35 +1041,24 @@ def generate_diagram_structure(architecture: Dict[str, Any], validation_result:
     logger.info(f"Diagram structure generated: {len(nodes)} nodes, {len(connections)} connections")
     return diagram
 
+def _attach_validation_status(resource_nodes: List[DiagramNode], resources: List[Dict[str, Any]],
+                              issues_by_resource: Dict[str, List[ValidationIssue]]) -> None:
+    """Record each resource's validation issue summary on its diagram node"""
+    for resource_node, resource in zip(resource_nodes, resources):
+        resource_issues = issues_by_resource.get(resource.get('name'), [])
+        resource_node.properties['validation_status'] = {
+            'issues_count': len(resource_issues),
+            'has_critical': any(issue.severity == ValidationSeverity.CRITICAL for issue in resource_issues),
+            'has_high': any(issue.severity == ValidationSeverity.HIGH for issue in resource_issues)
+        }
+
+def _node_id(raw_id: str) -> str:
+    """Normalize a raw node label into a diagram node id"""
+    return raw_id.lower().replace(' ', '-')
+
 def _get_resource_category(resource_type: str) -> str:
     """Map resource types to categories"""
-    category_map = {
-        'vm': 'compute',
-        'aks': 'compute',
-        'app_service': 'compute',
-        'virtual_network': 'networking',
-        'firewall': 'security',
-        'bastion': 'security',
-        'sql': 'database',
-        'cosmos_db': 'database',
-        'storage_account': 'storage',
-        'key_vault': 'security'
-    }
-    return category_map.get(resource_type.lower(), 'other')
-
-def _group_spoke_resources(resources: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-    """Group spoke resources by category for VNet organization"""
-    groups = {}
-    
-    for resource in resources:
-        resource_type = resource.get('type', '').lower()
-        category = _get_resource_category(resource_type)
-        
-        if category not in groups:
-            groups[category] = []
-        groups[category].append(resource)
-    
-    return groups
+    return RESOURCE_CATEGORY_MAP.get(resource_type.lower(), 'other')
 
 # Example usage and testing
 def example_usage():